@@ -0,0 +1,203 @@
+"""
+Async Calculation Routes
+
+``async def`` versions of the calculation CRUD, stats and export routes,
+served from an ``AsyncSession`` (asyncpg / aiosqlite). Enabled with
+``ASYNC_DB=true``; ``app.main`` then includes this router ahead of the
+sync routes so these handlers win for the same paths.
+
+Database work awaits the async driver instead of holding a threadpool
+slot, so a worker is no longer capped by the threadpool size. CRUD logic
+is shared with the sync routes by running ``calculation_service`` through
+``AsyncSession.run_sync``; that runs on the event loop, so only database
+work goes through it. Results are computed beforehand with
+``compute_async`` (inline when cheap, otherwise on the threadpool or the
+process pool), and authentication uses the async dependencies.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_active_user_async
+from app.database import get_async_db
+from app.schemas.calculation import (
+    CalculationType,
+    CalculationBase,
+    CalculationResponse,
+    CalculationUpdate,
+    dump_calculations,
+)
+from app.schemas.stats import CalculationStats
+from app.services import calculation_service, conditional
+from app.services.calculation_query import next_page_link
+from app.services.export_service import negotiate_export, astream_export
+
+
+router = APIRouter(tags=["calculations"])
+
+
+@router.post(
+    "/calculations",
+    response_model=CalculationResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_calculation(
+    calculation_data: CalculationBase,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    calculation = calculation_service.build_calculation(
+        calculation_data.type, current_user.id, calculation_data.inputs
+    )
+    calculation.result = await calculation_service.compute_async(calculation)
+    return await db.run_sync(
+        calculation_service.store_calculation, current_user.id, calculation
+    )
+
+
+@router.get("/calculations", response_model=List[CalculationResponse])
+async def list_calculations(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque token from X-Next-Cursor"),
+    calc_type: Optional[List[CalculationType]] = Query(None, alias="type"),
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    validators = await db.run_sync(conditional.lookup, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    rows, next_cursor = await db.run_sync(
+        lambda session: calculation_service.list_calculations(
+            session,
+            current_user.id,
+            limit,
+            cursor,
+            types=calc_type,
+            min_result=min_result,
+            max_result=max_result,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    )
+    response = Response(dump_calculations(rows), media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = next_page_link(request.url, next_cursor)
+    conditional.set_headers(response, validators)
+    return response
+
+
+@router.get("/calculations/stats", response_model=CalculationStats)
+async def get_statistics(
+    request: Request,
+    response: Response,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    validators = await db.run_sync(conditional.lookup, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    conditional.set_headers(response, validators)
+    return await db.run_sync(calculation_service.get_stats, current_user.id)
+
+
+@router.get("/calculations/export")
+@router.get("/calculations/report.csv")
+async def export_calculations(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson", "csv.gz", "ndjson.gz"]] = None,
+    calc_type: Optional[List[CalculationType]] = Query(None, alias="type"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    export_format = negotiate_export(
+        format,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
+    )
+
+    filename = f"calculations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format.extension}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if export_format.content_encoding:
+        headers["Content-Encoding"] = export_format.content_encoding
+
+    return StreamingResponse(
+        astream_export(
+            db,
+            current_user.id,
+            export_format,
+            types=calc_type,
+            created_after=created_after,
+            created_before=created_before,
+        ),
+        media_type=export_format.media_type,
+        headers=headers,
+    )
+
+
+@router.get("/calculations/{calc_id}", response_model=CalculationResponse)
+async def get_calculation(
+    calc_id: str,
+    request: Request,
+    response: Response,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    validators = await db.run_sync(conditional.lookup, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        # A missing or foreign id is still a 404, even for "If-None-Match: *"
+        await db.run_sync(calculation_service.check_owned, current_user.id, calc_id)
+        return cached
+
+    conditional.set_headers(response, validators)
+    return await db.run_sync(calculation_service.get_calculation, current_user.id, calc_id)
+
+
+@router.put("/calculations/{calc_id}", response_model=CalculationResponse)
+async def update_calculation(
+    calc_id: str,
+    calculation_update: CalculationUpdate,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    calculation = None
+    if calculation_update.inputs is not None:
+        calc_type = await db.run_sync(
+            calculation_service.calculation_type, current_user.id, calc_id
+        )
+        calculation = calculation_service.build_calculation(
+            calc_type, current_user.id, calculation_update.inputs
+        )
+        calculation.result = await calculation_service.compute_async(calculation)
+    return await db.run_sync(
+        calculation_service.store_update, current_user.id, calc_id, calculation
+    )
+
+
+@router.delete("/calculations/{calc_id}", status_code=204)
+async def delete_calculation(
+    calc_id: str,
+    current_user=Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await db.run_sync(calculation_service.delete_calculation, current_user.id, calc_id)
+    return None
@@ -2,20 +2,123 @@ from datetime import datetime
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from jose import jwt, JWTError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.database import async_session, get_db
 from app.schemas.user import UserResponse
 from app.models.user import User
+from app.auth.jwt import is_blacklisted
+from app.auth.token_cache import token_cache
+from app.auth.user_cache import fetch_user, user_cache
+from app.auth.revocation import revocation_store
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 def get_current_user(
-    token: str = Depends(oauth2_scheme)
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
 ) -> UserResponse:
     """
     Dependency to get the current user from the JWT token without a database lookup.
     This function supports two types of payloads:
       - A full payload as a dict containing user info.
       - A minimal payload, either as a dict with only a 'sub' key or directly as a UUID.
+
+    Verified tokens are served from ``token_cache`` until they expire or
+    are revoked; revoked tokens are rejected with 401.
+
+    With ``AUTH_DB_LOOKUP`` enabled the token's subject is resolved to the
+    real user row (through ``user_cache``), so deactivated or deleted users
+    are rejected. This is a sync dependency, so the lookup runs on the
+    threadpool rather than the event loop. ``db`` is the request's own
+    session; it only connects (lazily) on a ``user_cache`` miss.
+    """
+    # Pulls in other workers' revocations (evicting them from token_cache)
+    # before the cache is consulted
+    revocation_store.sync_if_due()
+
+    user = token_cache.get(token)
+    if user is None:
+        user = _user_from_token(token)
+        if _is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache.put(token, user)
+
+    if not settings.AUTH_DB_LOOKUP:
+        return user
+
+    db_user = user_cache.get(user.id)
+    if db_user is None:
+        db_user = fetch_user(db, user.id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return db_user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> UserResponse:
     """
+    ``get_current_user`` for the async routes, run on the event loop. The
+    common case (cached token, no sync due, user cached or no DB lookup)
+    does no I/O; revocation syncs and Bloom hits go to the threadpool and
+    user rows are loaded through an ``AsyncSession`` opened only on a
+    ``user_cache`` miss.
+    """
+    if revocation_store.sync_due():
+        await run_in_threadpool(revocation_store.sync_if_due)
+
+    user = token_cache.get(token)
+    if user is None:
+        user = _user_from_token(token)
+        jti = _jti(token)
+        if jti and await is_blacklisted(jti):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache.put(token, user)
+
+    if not settings.AUTH_DB_LOOKUP:
+        return user
+
+    db_user = user_cache.get(user.id)
+    if db_user is None:
+        async with async_session() as db:
+            db_user = await db.run_sync(fetch_user, user.id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return db_user
+
+
+def _jti(token: str):
+    try:
+        return jwt.get_unverified_claims(token).get("jti")
+    except JWTError:
+        return None
+
+
+def _is_revoked(token: str) -> bool:
+    """Revocation check for an already verified ``token``."""
+    jti = _jti(token)
+    return bool(jti) and revocation_store.is_revoked(jti)
+
+
+def _user_from_token(token: str) -> UserResponse:
+    """Full JWT verification of ``token`` (the cache-miss path)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,3 +182,10 @@ def get_current_active_user(
             detail="Inactive user"
         )
     return current_user
+
+
+async def get_current_active_user_async(
+    current_user: UserResponse = Depends(get_current_user_async)
+) -> UserResponse:
+    """``get_current_active_user`` for the async routes."""
+    return get_current_active_user(current_user)
@@ -0,0 +1,109 @@
+# app/auth/hashing.py
+"""
+Dedicated executor for bcrypt.
+
+A bcrypt hash at ``BCRYPT_ROUNDS=12`` is ~250 ms of CPU. Running it inline
+lets a login storm occupy every thread in the shared request threadpool.
+Instead, hashes run on a small dedicated pool (bcrypt releases the GIL, so
+threads give real parallelism) with a hard cap on queued work: once
+``PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT`` hashes are in flight,
+new ones fail fast with 503 rather than piling up behind the others.
+
+The auth routes are ``async def`` and await ``run_async``, so a hash in
+flight holds no request-threadpool thread; ``run`` blocks its caller and is
+kept for sync code paths.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, register_source
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor that rejects work beyond ``max_workers + queue_limit``."""
+
+    def __init__(self, max_workers: int, queue_limit: int, name: str = "bounded"):
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_limit
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        self.queue_wait = Histogram()
+        self.run_time = Histogram()
+        self.rejected = Counter()
+
+    def run(self, fn, *args):
+        """
+        Run ``fn(*args)`` on the pool and wait for its result.
+
+        Raises:
+            HTTPException: 503 with ``Retry-After`` when the pool is saturated.
+        """
+        return self._submit(fn, args).result()
+
+    async def run_async(self, fn, *args):
+        """``run`` for the event loop: awaits the result without blocking a thread."""
+        return await asyncio.wrap_future(self._submit(fn, args))
+
+    def _submit(self, fn, args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry.",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+            )
+
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def release():
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        # The slot is released by the worker once the hash is done, before
+        # the result is delivered, and even if the waiting request is gone
+        def timed():
+            started = time.perf_counter()
+            self.queue_wait.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.run_time.observe(time.perf_counter() - started)
+                release()
+
+        try:
+            future = self._executor.submit(timed)
+        except BaseException:
+            release()
+            raise
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "capacity": self.capacity,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected.value,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "hash_seconds": self.run_time.snapshot(),
+        }
+
+
+password_executor = BoundedExecutor(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_LIMIT,
+    name="bcrypt",
+)
+
+register_source("password_hashing", password_executor.stats)
@@ -5,11 +5,13 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 import secrets
 
 from app.core.config import get_settings
-#from app.auth.redis import add_to_blacklist, is_blacklisted
+from app.auth.hashing import password_executor
+from app.auth.revocation import revocation_store
 from app.schemas.token import TokenType
 from app.database import get_db
 from sqlalchemy.orm import Session
@@ -27,12 +29,20 @@ pwd_context = CryptContext(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a plain password against its hash (on the bcrypt pool)."""
+    return password_executor.run(pwd_context.verify, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    """Hash a password using bcrypt (on the bcrypt pool)."""
+    return password_executor.run(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` for async routes; holds no threadpool thread."""
+    return await password_executor.run_async(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` for async routes; holds no threadpool thread."""
+    return await password_executor.run_async(pwd_context.hash, password)
 
 def create_token(
     user_id: Union[str, UUID],
@@ -137,6 +147,9 @@ async def get_current_user(
     """
     Dependency to get current user from access token.
     Returns the actual User model instance.
+
+    The synchronous session query runs on the threadpool so it does not
+    block the event loop.
     """
     try:
         payload = await decode_token(token, TokenType.ACCESS)
@@ -153,7 +166,9 @@ async def get_current_user(
             )
 
         # DB lookup
-        user = db.query(User).filter(User.id == user_uuid).first()
+        user = await run_in_threadpool(
+            lambda: db.query(User).filter(User.id == user_uuid).first()
+        )
         if user is None:
             raise HTTPException(    
                 status_code=status.HTTP_401_UNAUTHORIZED,  # required by test
@@ -182,13 +197,23 @@ async def get_current_user(
 
 
 # --------------------------------------------------------------------
-# BLACKLIST STUBS (required ONLY for testing)
-# These do nothing in real app but allow tests to monkeypatch them.
+# BLACKLIST
+# Backed by app.auth.revocation; tests monkeypatch these directly.
 # --------------------------------------------------------------------
 async def is_blacklisted(jti: str) -> bool:
-    """Stub blacklist check - default False (token allowed)."""
-    return False
+    """Whether ``jti`` was revoked. Bloom-filter negatives return without I/O."""
+    if revocation_store.known_not_revoked(jti):
+        return False
+    return await run_in_threadpool(revocation_store.is_revoked, jti)
 
-async def add_to_blacklist(jti: str) -> None:
-    """Stub blacklist writer - does nothing."""
-    return None # pragma: no cover
+async def add_to_blacklist(jti: str, expires_at: Optional[datetime] = None) -> bool:
+    """
+    Revoke ``jti`` until ``expires_at`` (the token's own expiry). Without
+    one, the row is kept for the longest token lifetime. Returns False if
+    ``jti`` was already revoked (e.g. by a concurrent request).
+    """
+    if expires_at is None:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return await run_in_threadpool(revocation_store.revoke, jti, expires_at)
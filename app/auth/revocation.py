@@ -0,0 +1,228 @@
+# app/auth/revocation.py
+"""
+Token revocation store.
+
+Revoked ``jti``s live in the ``revoked_tokens`` table until the token would
+have expired anyway. Every authenticated request has to ask "is this token
+revoked?", and the answer is almost always no, so an in-memory Bloom filter
+of revoked ``jti``s sits in front of the table: a negative answer is a few
+hash probes with no I/O, and only Bloom hits (real revocations plus a small
+false-positive rate) query the database.
+
+The filter is per process. Each worker picks up revocations made by other
+workers by reading rows newer than its last sync, at most once every
+``REVOCATION_SYNC_SECONDS``; expired rows are pruned (and the filter
+rebuilt) every ``REVOCATION_PRUNE_SECONDS``.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.auth.token_cache import token_cache
+from app.core.config import settings
+from app.core.metrics import Counter, register_source
+from app.database import SessionLocal
+from app.models.revoked_token import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationStore:
+    """``revoked_tokens`` table fronted by a per-process Bloom filter."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        capacity: int,
+        error_rate: float,
+        sync_interval: float,
+        prune_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+
+        self._bloom: Optional[BloomFilter] = None
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+        self.checks = Counter()
+        self.bloom_negatives = Counter()
+        self.db_lookups = Counter()
+        self.revocations = Counter()
+
+    # -- fast path -------------------------------------------------------
+
+    def known_not_revoked(self, jti: str) -> bool:
+        """
+        True when the filter alone proves ``jti`` is not revoked and no sync
+        is due, i.e. when the answer needs no I/O. False means "ask
+        ``is_revoked``", not "revoked".
+        """
+        bloom = self._bloom
+        if bloom is None or time.monotonic() >= self._next_sync or jti in bloom:
+            return False
+        self.checks.inc()
+        self.bloom_negatives.inc()
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        """Whether ``jti`` has been revoked. Blocking on Bloom hits and syncs."""
+        self.sync_if_due()
+        self.checks.inc()
+        if jti not in self._bloom:
+            self.bloom_negatives.inc()
+            return False
+
+        self.db_lookups.inc()
+        with self.session_factory() as db:
+            row = db.get(RevokedToken, jti)
+            return row is not None and row.expires_at > datetime.utcnow()
+
+    # -- writes ------------------------------------------------------------
+
+    def revoke(self, jti: str, expires_at: datetime) -> bool:
+        """
+        Record ``jti`` as revoked until ``expires_at`` (naive UTC). Returns
+        False if it already was: the insert is conditional, so of several
+        concurrent revocations of one token exactly one returns True.
+        """
+        with self.session_factory() as db:
+            inserted = _insert_once(db, jti, expires_at)
+            db.commit()
+
+        self.sync_if_due()
+        self._bloom.add(jti)
+        token_cache.invalidate_jti(jti)
+        if inserted:
+            self.revocations.inc()
+        return inserted
+
+    # -- maintenance -------------------------------------------------------
+
+    def sync_due(self) -> bool:
+        """Whether the next ``sync_if_due`` would do I/O."""
+        return self._bloom is None or time.monotonic() >= self._next_sync
+
+    def sync_if_due(self) -> None:
+        """Load revocations made by other workers, and prune, when due."""
+        if not self.sync_due():
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._bloom is None or now >= self._next_prune:
+                self._rebuild()
+                self._next_prune = now + self.prune_interval
+            elif now >= self._next_sync:
+                self._sync()
+            self._next_sync = now + self.sync_interval
+
+    def _rebuild(self) -> None:
+        """Drop expired rows and refill a fresh filter from the rest."""
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete()
+            db.commit()
+            rows = db.query(RevokedToken.jti, RevokedToken.revoked_at).all()
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        for jti, _ in rows:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._watermark = max((revoked_at for _, revoked_at in rows), default=now)
+
+    def _sync(self) -> None:
+        # Re-read one interval behind the watermark so rows committed late
+        # (or stamped by a worker with a slightly slow clock) are not missed
+        since = self._watermark - timedelta(seconds=self.sync_interval)
+        with self.session_factory() as db:
+            rows = (
+                db.query(RevokedToken.jti, RevokedToken.revoked_at)
+                .filter(RevokedToken.revoked_at >= since)
+                .all()
+            )
+        for jti, revoked_at in rows:
+            self._bloom.add(jti)
+            token_cache.invalidate_jti(jti)
+            self._watermark = max(self._watermark, revoked_at)
+
+    def reset(self) -> None:
+        """Forget the filter; the next check reloads it from the table."""
+        with self._lock:
+            self._bloom = None
+
+    def stats(self) -> dict:
+        checks = self.checks.value
+        return {
+            "checks": checks,
+            "bloom_negatives": self.bloom_negatives.value,
+            "db_lookups": self.db_lookups.value,
+            "revocations": self.revocations.value,
+            "bloom_bits": self._bloom.num_bits if self._bloom else 0,
+            "fast_path_rate": self.bloom_negatives.value / checks if checks else 0.0,
+        }
+
+
+def _insert_once(db: Session, jti: str, expires_at: datetime) -> bool:
+    """Insert the ``revoked_tokens`` row unless it exists; True if inserted."""
+    values = dict(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow())
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        result = db.execute(
+            upsert(RevokedToken).values(**values).on_conflict_do_nothing(index_elements=["jti"])
+        )
+        return result.rowcount == 1
+
+    try:  # pragma: no cover  (other dialects)
+        with db.begin_nested():
+            db.execute(insert(RevokedToken).values(**values))
+        return True
+    except IntegrityError:  # pragma: no cover
+        return False
+
+
+revocation_store = RevocationStore(
+    SessionLocal,
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+    prune_interval=settings.REVOCATION_PRUNE_SECONDS,
+)
+
+register_source("revocation", revocation_store.stats)
@@ -0,0 +1,109 @@
+# app/auth/token_cache.py
+"""
+Bounded LRU of verified bearer tokens.
+
+``get_current_user`` would otherwise re-run the full JWT decode and HMAC
+check for the same token on every request. Once a token has been verified,
+the resolved user is cached under the token string until the token's own
+``exp`` (or until it is evicted as least recently used), so repeat callers
+pay a dict lookup. Revoking a token's ``jti`` drops its entries at once.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from jose import jwt, JWTError
+
+from app.core.config import settings
+from app.core.metrics import Counter, register_source
+
+
+class TokenCache:
+    """Thread-safe LRU of token -> resolved user, bounded by ``maxsize``."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (value, exp, jti)
+        self._by_jti: dict = {}
+        self._lock = threading.Lock()
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached value for ``token``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(token)
+                self.hits.inc()
+                return entry[0]
+            if entry is not None:
+                self._drop(token)
+        self.misses.inc()
+        return None
+
+    def put(self, token: str, value: Any) -> None:
+        """
+        Cache ``value`` for a verified ``token`` until its ``exp`` claim.
+        Tokens without a readable ``exp`` are not cached.
+        """
+        if self.maxsize <= 0:
+            return
+        try:
+            claims = jwt.get_unverified_claims(token)
+            exp = float(claims["exp"])
+        except (JWTError, KeyError, TypeError, ValueError):
+            return
+        if exp <= time.time():
+            return
+
+        jti = claims.get("jti")
+        with self._lock:
+            if token in self._entries:
+                self._drop(token)
+            self._entries[token] = (value, exp, jti)
+            if jti:
+                self._by_jti.setdefault(jti, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions.inc()
+
+    def invalidate_jti(self, jti: str) -> None:
+        """Forget every cached token carrying ``jti`` (called on revocation)."""
+        with self._lock:
+            for token in list(self._by_jti.get(jti, ())):
+                self._drop(token)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._by_jti.clear()
+
+    def _drop(self, token: str) -> None:
+        _, _, jti = self._entries.pop(token)
+        tokens = self._by_jti.get(jti)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_jti[jti]
+
+    def stats(self) -> dict:
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.evictions.value,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+register_source("token_cache", token_cache.stats)
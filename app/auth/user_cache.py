@@ -0,0 +1,165 @@
+# app/auth/user_cache.py
+"""
+TTL cache of database-resolved users.
+
+With ``AUTH_DB_LOOKUP`` on, ``get_current_user`` loads the real ``User`` row
+so ``is_active`` is enforced against the database. To avoid a query per
+request, the resolved ``UserResponse`` snapshot is kept per user id for
+``USER_CACHE_TTL`` seconds. Any committed UPDATE or DELETE of a ``User``
+(deactivation, profile change, login) drops that user's entry at once, so
+the TTL only bounds staleness for changes made outside this process.
+Entries are dropped after the commit, not at flush: invalidating earlier
+would let a concurrent request re-cache the old row before it commits.
+
+That alone does not stop a read that queried the old row just before the
+commit from putting it back just after the invalidation. Every
+invalidation therefore bumps the user's generation; ``fetch_user`` reads
+the generation before its query and ``put`` drops the row if it changed.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.metrics import Counter, register_source
+from app.models.user import User
+from app.schemas.user import UserResponse
+
+
+class UserCache:
+    """Thread-safe LRU of user id -> ``UserResponse`` with a fixed TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[UUID, tuple]" = OrderedDict()  # id -> (user, expires_at)
+        # id -> generation of its last invalidation, most recent last. Ids
+        # pruned from here fall back to ``_floor``, the highest generation
+        # pruned so far, so a pruned id never looks unchanged.
+        self._generations: "OrderedDict[UUID, int]" = OrderedDict()
+        self._floor = 0
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.invalidations = Counter()
+
+    def get(self, user_id: UUID) -> Optional[UserResponse]:
+        """Return the cached user, or None if absent or past its TTL."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits.inc()
+                return entry[0]
+            if entry is not None:
+                del self._entries[user_id]
+        self.misses.inc()
+        return None
+
+    def generation(self, user_id: UUID) -> int:
+        """Token for ``put``: changes whenever ``user_id`` is invalidated."""
+        with self._lock:
+            return self._generations.get(user_id, self._floor)
+
+    def put(self, user: UserResponse, generation: Optional[int] = None) -> None:
+        """
+        Cache ``user``. With ``generation`` (read before loading the row),
+        the row is dropped if the user was invalidated in the meantime.
+        """
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations.get(user.id, self._floor):
+                return
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Forget ``user_id`` (called whenever its row changes)."""
+        with self._lock:
+            self._generations[user_id] = next(self._counter)
+            self._generations.move_to_end(user_id)
+            while len(self._generations) > max(self.maxsize, 1):
+                self._floor = max(self._floor, self._generations.popitem(last=False)[1])
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations.inc()
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "invalidations": self.invalidations.value,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+register_source("user_cache", user_cache.stats)
+
+
+# Session.info key collecting ids of users flushed since the last commit
+_CHANGED_USERS = "user_cache.changed"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is None:
+        user_cache.invalidate(target.id)
+    else:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        user_cache.invalidate(user_id)
+
+
+def load_user(db: Session, user_id: UUID) -> Optional[UserResponse]:
+    """
+    Resolve ``user_id`` to a ``UserResponse``, from the cache when fresh and
+    otherwise from the database. Blocking: call from a sync dependency (run
+    on the threadpool) or via ``run_in_threadpool``.
+    """
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    return fetch_user(db, user_id)
+
+
+def fetch_user(db: Session, user_id: UUID) -> Optional[UserResponse]:
+    """
+    The database half of ``load_user``: query, snapshot and cache. The
+    snapshot is not cached if the user was invalidated while it was read.
+    """
+    generation = user_cache.generation(user_id)
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+
+    resolved = UserResponse.model_validate(user)
+    user_cache.put(resolved, generation)
+    return resolved
@@ -1,7 +1,7 @@
 # app/config.py
 from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 class Settings(BaseSettings):
     # Database settings (keeping your existing default)
@@ -10,16 +10,101 @@ class Settings(BaseSettings):
     TEST_DATABASE_URL: str = "sqlite:///./test.db"
     IS_TEST: bool = False 
 
+    # Serve calculation routes as async def on an async engine
+    # (asyncpg / aiosqlite). ASYNC_DATABASE_URL defaults to DATABASE_URL
+    # with the driver swapped.
+    ASYNC_DB: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per worker process). Defaults match SQLAlchemy's;
+    # -1 disables recycling.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+
     # JWT Settings
     JWT_SECRET_KEY: str = "your-super-secret-key-change-this-in-production"
     JWT_REFRESH_SECRET_KEY: str = "your-refresh-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # /auth/refresh also issues a new refresh token and revokes the old one
+    REFRESH_TOKEN_ROTATION: bool = False
     
     # Security
     BCRYPT_ROUNDS: int = 12
+
+    # bcrypt runs on its own pool; hashes beyond workers + queue limit
+    # are rejected with 503 and Retry-After (seconds)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+    PASSWORD_HASH_RETRY_AFTER: int = 1
     CORS_ORIGINS: List[str] = ["*"]
+
+    # GET /metrics is served only when this is set, to requests sending
+    # "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN: str = ""
+
+    # Verified bearer tokens kept by get_current_user (0 disables caching)
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Resolve the current user from the database (enforces is_active);
+    # rows are cached per user for USER_CACHE_TTL seconds and dropped
+    # whenever the user is updated or deleted
+    AUTH_DB_LOOKUP: bool = False
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0
+
+    # Revoked-token Bloom filter: sized for this many jtis at this
+    # false-positive rate; other workers' revocations are picked up every
+    # REVOCATION_SYNC_SECONDS, expired rows pruned every REVOCATION_PRUNE_SECONDS
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_SECONDS: float = 5.0
+    REVOCATION_PRUNE_SECONDS: float = 3600.0
+
+    # Powers whose projected result exceeds this many decimal digits are
+    # rejected with 400 before being computed (308 = float range)
+    CALC_MAX_RESULT_DIGITS: float = 308.0
+
+    # Calculations with an estimated cost (operands + projected power
+    # digits) of at least CALC_OFFLOAD_MIN_COST run on a process pool,
+    # failing with 504 after CALC_TASK_TIMEOUT seconds; 0 workers = inline
+    CALC_PROCESS_WORKERS: int = 2
+    CALC_OFFLOAD_MIN_COST: float = 50000
+    CALC_TASK_TIMEOUT: float = 10.0
+
+    # Memoized calculation results: bounded by entries and total operands held
+    RESULT_CACHE_SIZE: int = 10000
+    RESULT_CACHE_MAX_OPERANDS: int = 1_000_000
+
+    # Calculation operands column: "json" (JSON array) or "binary"
+    # (packed float64 blob, loaded as array('d')). Switching an existing
+    # Postgres database needs the column type migrated.
+    CALC_INPUTS_STORAGE: Literal["json", "binary"] = "json"
+
+    # POST /calculations/packed: largest float64 operand array accepted
+    CALC_PACKED_MAX_OPERANDS: int = 10_000_000
+
+    # Batch calculations
+    BATCH_MAX_ITEMS: int = 50000
+
+    # Background jobs (POST /calculations/jobs): worker threads per process,
+    # items per committed chunk, idle poll interval, and how long a running
+    # job may go without a heartbeat before it is requeued
+    CALC_JOB_WORKERS: int = 1
+    CALC_JOB_CHUNK_SIZE: int = 1000
+    CALC_JOB_POLL_SECONDS: float = 2.0
+    CALC_JOB_STALE_SECONDS: float = 300.0
+
+    # Exports: rows fetched per database round trip while streaming
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Encode JSON responses with orjson app-wide instead of json.dumps
+    # (ignored when orjson is not installed)
+    FAST_JSON_RESPONSES: bool = False
     
     
     class Config:
@@ -0,0 +1,69 @@
+# app/core/metrics.py
+"""
+Minimal in-process metrics.
+
+Components keep their own ``Counter``/``Histogram`` objects and register a
+snapshot callable with ``register_source``; ``collect()`` gathers every
+source into one JSON-friendly dict for the ``/metrics`` endpoint.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence
+
+# Seconds; covers sub-millisecond pool checkouts up to multi-second waits
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (cumulative counts, like Prometheus)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self._bounds, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        cumulative, running = {}, 0
+        for bound, count in zip(self._bounds + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
+
+
+_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register_source(name: str, snapshot: Callable[[], dict]) -> None:
+    """Expose ``snapshot()`` under ``name`` in ``collect()``; re-registering replaces it."""
+    _sources[name] = snapshot
+
+
+def collect() -> dict:
+    return {name: snapshot() for name, snapshot in _sources.items()}
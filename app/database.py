@@ -1,9 +1,81 @@
 # app/database.py
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import Counter, Histogram, register_source
+
+
+# ----------------------------------------------------------
+# CONNECTION POOL
+# ----------------------------------------------------------
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time and checkout timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = Counter()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts.inc()
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # Keep the counters across engine.dispose()
+        pool = super().recreate()
+        pool.wait_time, pool.timeouts = self.wait_time, self.timeouts
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """``InstrumentedQueuePool`` for async engines (asyncio-aware queue)."""
+
+
+def pool_options(poolclass=InstrumentedQueuePool) -> dict:
+    """create_engine() pool arguments from the DB_POOL_* settings."""
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine) -> dict:
+    """Live checkout figures for ``engine``'s pool (empty for non-queue pools)."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool.overflow() counts down from -pool_size until the pool
+        # is full; only connections beyond pool_size are overflow
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        status["checkout_timeouts"] = pool.timeouts.value
+        status["checkout_wait_seconds"] = pool.wait_time.snapshot()
+    return status
 
 
 # ----------------------------------------------------------
@@ -14,13 +86,17 @@ def get_engine(database_url: str | None = None):
     """Return an engine using DATABASE_URL or a provided override."""
     url = database_url or settings.DATABASE_URL
 
-    # SQLite needs special connect args
+    # SQLite needs special connect args; in-memory databases keep
+    # SQLAlchemy's default single-connection pool
     if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            return create_engine(url, connect_args={"check_same_thread": False})
         return create_engine(
             url,
-            connect_args={"check_same_thread": False}
+            connect_args={"check_same_thread": False},
+            **pool_options(),
         )
-    return create_engine(url)
+    return create_engine(url, **pool_options())
 
 
 def get_sessionmaker(engine):
@@ -34,6 +110,8 @@ engine = get_engine()
 # SessionLocal bound to the selected engine (Postgres or SQLite)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+register_source("db_pool", lambda: pool_status(engine))
+
 # Declarative base
 Base = declarative_base()
 
@@ -51,6 +129,65 @@ def get_db():
         db.close()
 
 
+# ----------------------------------------------------------
+# OPTIONAL ASYNC ENGINE (settings.ASYNC_DB)
+# ----------------------------------------------------------
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str | None = None) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+    url = database_url or settings.ASYNC_DATABASE_URL or settings.DATABASE_URL
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def get_async_engine(database_url: str | None = None):
+    """
+    Return an AsyncEngine; the async driver is only imported here. It gets
+    the same DB_POOL_* sizing as the sync engine (its own pool, so both
+    together may hold up to twice DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    url = get_async_database_url(database_url)
+    if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+        return create_async_engine(url)
+    return create_async_engine(url, **pool_options(InstrumentedAsyncQueuePool))
+
+
+def get_async_sessionmaker(async_engine):
+    """Return an async_sessionmaker bound to the given AsyncEngine."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+_async_sessionmaker = None
+
+
+async def get_async_db():
+    """Provide an AsyncSession for the async routes (engine built lazily)."""
+    async with async_session() as db:
+        yield db
+
+
+def async_session():
+    """
+    A new AsyncSession (use as ``async with``), for callers that only need
+    one on some paths. Builds the async engine on first use.
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        async_engine = get_async_engine()
+        _async_sessionmaker = get_async_sessionmaker(async_engine)
+        register_source("db_pool_async", lambda: pool_status(async_engine.sync_engine))
+    return _async_sessionmaker()
+
+
 # ----------------------------------------------------------
 # MODEL INITIALIZATION FUNCTION
 # ----------------------------------------------------------
@@ -62,3 +199,6 @@ def init_models():
     """
     from app.models.user import User
     from app.models.calculation import Calculation
+    from app.models.user_stats import UserCalculationStats
+    from app.models.revoked_token import RevokedToken
+    from app.models.calculation_job import CalculationJob, CalculationJobResult
@@ -1,11 +1,69 @@
+"""
+Schema creation and in-place upgrades.
+
+``create_all`` only creates missing tables; it never adds columns or
+indexes to a table that already exists. ``upgrade_db`` adds what
+``calculations`` gained since it was first released, so a database created
+by an older version keeps working. It is idempotent and runs once per
+deployment via ``python -m app.database_init`` rather than from every
+worker's startup, where concurrent workers would race on the ALTER. The
+same steps are listed as SQL in the README for running them by hand.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text, update
+
 from app.database import engine
 from app.models.user import Base
 
+logger = logging.getLogger(__name__)
+
+OPERAND_COUNT_DDL = "ALTER TABLE calculations ADD COLUMN operand_count INTEGER"
+KEYSET_INDEX = "ix_calculations_user_created_id"
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
 def drop_db():
     Base.metadata.drop_all(bind=engine)
 
+
+def upgrade_db(bind=engine) -> List[str]:
+    """
+    Add and backfill ``calculations.operand_count`` and create the keyset
+    pagination index if they are missing. Returns the steps applied (empty
+    once the schema is current).
+    """
+    from app.models.calculation import Calculation, operand_count_sql
+
+    calculations = Calculation.__table__
+    applied = []
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        if "calculations" not in inspector.get_table_names():
+            return applied
+
+        if "operand_count" not in {c["name"] for c in inspector.get_columns("calculations")}:
+            conn.execute(text(OPERAND_COUNT_DDL))
+            conn.execute(
+                update(calculations)
+                .where(calculations.c.operand_count.is_(None))
+                .values(operand_count=operand_count_sql())
+            )
+            applied += [OPERAND_COUNT_DDL, "backfill calculations.operand_count"]
+
+        if KEYSET_INDEX not in {ix["name"] for ix in inspector.get_indexes("calculations")}:
+            next(ix for ix in calculations.indexes if ix.name == KEYSET_INDEX).create(conn)
+            applied.append(f"CREATE INDEX {KEYSET_INDEX}")
+
+    for step in applied:
+        logger.info("Schema upgrade: %s", step)
+    return applied
+
+
 if __name__ == "__main__":
-    init_db() # pragma: no cover
\ No newline at end of file
+    init_db() # pragma: no cover
+    upgrade_db() # pragma: no cover
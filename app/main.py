@@ -2,35 +2,67 @@
 FastAPI Main Application Module
 """
 
+import hmac
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
+from typing import List, Literal, Optional
 from uuid import UUID
-from typing import List
 
 # FastAPI
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, Query
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 
 # SQLAlchemy
 from sqlalchemy.orm import Session
 
 # App imports
-from app.auth.dependencies import get_current_active_user
-from app.models.calculation import Calculation
+from app.core import metrics
+from app.core.responses import json_response_class
+from app.auth.dependencies import get_current_active_user, oauth2_scheme
+from app.auth.jwt import (
+    add_to_blacklist,
+    create_token,
+    decode_token,
+    get_password_hash_async,
+    verify_password_async,
+)
+from app.auth.user_cache import load_user
 from app.models.user import User
 from app.schemas.calculation import (
+    CalculationType,
     CalculationBase,
     CalculationResponse,
-    CalculationUpdate
+    CalculationUpdate,
+    CalculationBatchRequest,
+    CalculationBatchResponse,
+    CalculationBulkCreate,
+    CalculationBulkCreateResponse,
+    CalculationJobResponse,
+    CalculationPackedResponse,
+    dump_calculations,
 )
-from app.schemas.token import TokenResponse
+from app.schemas.token import Token, TokenResponse, TokenType, RefreshRequest, LogoutRequest
 from app.schemas.user import UserCreate, UserResponse, UserLogin
 from app.schemas.stats import CalculationStats
-from app.services.statistics_service import compute_user_stats
+from app.services.export_service import negotiate_export, stream_export
+from app.services.user_stats_service import apply_calculation_delta
+from app.services import calculation_service, conditional
+from app.services.calculation_query import next_page_link
+from app.services.calc_executor import calculation_executor
+from app.services import job_service
+from app.services.batch_service import (
+    evaluate_batch,
+    normalize_type,
+    insert_calculations,
+    bulk_create_calculations,
+    decode_packed_inputs,
+)
 from app.database import Base, get_db, engine
+from app.core.config import settings
 
 
 # ------------------------------------------------------------------------------
@@ -39,22 +71,34 @@ from app.database import Base, get_db, engine
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Importing models...")
-    from app.models import user, calculation
+    from app.models import user, calculation, user_stats, revoked_token, calculation_job
 
     print("Creating tables...")
     Base.metadata.create_all(bind=engine)
     print("Tables created successfully!")
 
+    job_service.job_worker.start()
+
     yield
 
+    job_service.job_worker.stop()
+    calculation_executor.shutdown()
+
 
 app = FastAPI(
     title="Calculations API",
     description="API for managing calculations",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=json_response_class(),
 )
 
+# Async calculation routes are registered first so they take precedence
+# over the sync handlers for the same paths.
+if settings.ASYNC_DB:   # pragma: no cover
+    from app.async_routes import router as async_calculation_router
+    app.include_router(async_calculation_router)
+
 
 # ------------------------------------------------------------------------------
 # Static + Templates
@@ -106,6 +150,27 @@ def read_health():
     return {"status": "ok"}   # pragma: no cover
 
 
+@app.get("/metrics", tags=["health"])
+def read_metrics(request: Request):
+    """
+    Process-local metrics (connection pool, etc.) for this worker. Disabled
+    (404) unless ``METRICS_TOKEN`` is set; callers must send it as a bearer
+    token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return metrics.collect()
+
+
 # ------------------------------------------------------------------------------
 # AUTH: Register User
 # ------------------------------------------------------------------------------
@@ -115,24 +180,47 @@ def read_health():
     status_code=status.HTTP_201_CREATED,
     tags=["auth"]
 )
-def register(user_create: UserCreate, db: Session = Depends(get_db)):
+async def register(user_create: UserCreate, db: Session = Depends(get_db)):
+    # Database steps run on the threadpool; the bcrypt hash is awaited on its
+    # own pool so it holds no threadpool thread
     user_data = user_create.dict(exclude={"confirm_password"})
     try:
-        user = User.register(db, user_data)
-        db.commit()
-        db.refresh(user)
-        return user
+        await run_in_threadpool(User.check_registration, db, user_data)
+        hashed_password = await get_password_hash_async(user_data["password"])
+        return await run_in_threadpool(_store_user, db, user_data, hashed_password)
     except ValueError as e:        # unreachable in tests → no cover
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=400, detail=str(e))  # pragma: no cover
 
 
+def _store_user(db: Session, user_data: dict, hashed_password: str) -> User:
+    user = User.register(db, user_data, hashed_password=hashed_password)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+async def _authenticate(db: Session, username_or_email: str, password: str):
+    """``User.authenticate`` with the password check awaited on the bcrypt pool."""
+    user = await run_in_threadpool(User.find_by_login, db, username_or_email)
+    if user is None or not await verify_password_async(password, user.password):
+        return None
+    return await run_in_threadpool(_login, db, user)
+
+
+def _login(db: Session, user: User) -> dict:
+    auth_result = user.issue_tokens(db)
+    db.commit()
+    db.refresh(user)
+    return auth_result
+
+
 # ------------------------------------------------------------------------------
 # AUTH: Login (JSON)
 # ------------------------------------------------------------------------------
 @app.post("/auth/login", response_model=TokenResponse, tags=["auth"])
-def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
-    auth_result = User.authenticate(db, user_login.username, user_login.password)
+async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+    auth_result = await _authenticate(db, user_login.username, user_login.password)
     if auth_result is None:
         raise HTTPException(
             status_code=401,
@@ -141,7 +229,6 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
         )  # pragma: no cover
 
     user = auth_result["user"]
-    db.commit()
 
     expires_at = auth_result.get("expires_at")
     if expires_at and expires_at.tzinfo is None:  # rarely hit
@@ -164,13 +251,79 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
     )
 
 
+# ------------------------------------------------------------------------------
+# AUTH: Refresh (new access token without a password check)
+# ------------------------------------------------------------------------------
+@app.post("/auth/refresh", response_model=Token, tags=["auth"])
+async def refresh_access_token(body: RefreshRequest, db: Session = Depends(get_db)):
+    payload = await decode_token(body.refresh_token, TokenType.REFRESH)
+
+    try:
+        user_id = UUID(str(payload["sub"]))
+    except (KeyError, ValueError):
+        user_id = None
+    user = None if user_id is None else await run_in_threadpool(load_user, db, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=401,
+            detail="User not found or inactive",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    refresh_token = body.refresh_token
+    if settings.REFRESH_TOKEN_ROTATION:
+        # The conditional revoke makes the old token single-use: of two
+        # concurrent refreshes with it, only one gets new tokens
+        revoked = await add_to_blacklist(
+            payload["jti"], datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
+        if not revoked:
+            raise HTTPException(
+                status_code=401,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        refresh_token = create_token(user.id, TokenType.REFRESH)
+
+    return Token(
+        access_token=create_token(user.id, TokenType.ACCESS),
+        refresh_token=refresh_token,
+        token_type="bearer",
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+# ------------------------------------------------------------------------------
+# AUTH: Logout (revoke access + optional refresh token)
+# ------------------------------------------------------------------------------
+@app.post("/auth/logout", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+async def logout(
+    body: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+):
+    access = await decode_token(token, TokenType.ACCESS)
+    revoke = [access]
+
+    if body is not None and body.refresh_token:
+        refresh = await decode_token(body.refresh_token, TokenType.REFRESH)
+        if refresh["sub"] != access["sub"]:
+            raise HTTPException(status_code=400, detail="Refresh token belongs to another user")
+        revoke.append(refresh)
+
+    for payload in revoke:
+        await add_to_blacklist(
+            payload["jti"], datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 # ------------------------------------------------------------------------------
 # AUTH: OAuth2 login (Swagger)
 # ------------------------------------------------------------------------------
 @app.post("/auth/token", tags=["auth"])   # pragma: no cover
-def login_form(form_data: OAuth2PasswordRequestForm = Depends(),
-               db: Session = Depends(get_db)):             # pragma: no cover
-    auth_result = User.authenticate(db, form_data.username, form_data.password)
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends(),
+                     db: Session = Depends(get_db)):       # pragma: no cover
+    auth_result = await _authenticate(db, form_data.username, form_data.password)
     if auth_result is None:
         raise HTTPException(
             status_code=401,
@@ -194,35 +347,229 @@ def create_calculation(
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
+    return calculation_service.create_calculation(db, current_user.id, calculation_data)
+
+
+# ------------------------------------------------------------------------------
+# CREATE Calculation from packed float64 operands
+# ------------------------------------------------------------------------------
+@app.post(
+    "/calculations/packed",
+    response_model=CalculationPackedResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["calculations"]
+)
+async def create_packed_calculation(
+    request: Request,
+    calc_type: CalculationType = Query(..., alias="type"),
+    encoding: Literal["raw", "base64"] = Query(
+        "raw", description="raw little-endian float64 bytes, or the same bytes base64-encoded"
+    ),
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create a calculation whose operands are sent as a packed float64 body
+    (``application/octet-stream``) instead of a JSON list. The body is
+    viewed with ``numpy.frombuffer`` and evaluated vectorially, so very
+    large operand lists skip per-element parsing and validation.
+    """
+    limit = settings.CALC_PACKED_MAX_OPERANDS * 8
+    if encoding == "base64":
+        limit = 4 * -(-limit // 3)
+    body = await _read_body(request, limit)
+
     try:
-        new_calc = Calculation.create(
-            calculation_type=calculation_data.type,
-            user_id=current_user.id,
-            inputs=calculation_data.inputs,
-        )
-        new_calc.result = new_calc.get_result()
+        values = decode_packed_inputs(body, encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await run_in_threadpool(
+        calculation_service.create_packed_calculation,
+        db, current_user.id, calc_type.value, values,
+    )
+
+
+async def _read_body(request: Request, limit: int) -> bytearray:
+    """
+    Read the request body, answering 413 as soon as it is known to exceed
+    ``limit`` bytes: from Content-Length before reading anything, otherwise
+    (chunked uploads, lying clients) once the streamed bytes pass it.
+    """
+    too_large = HTTPException(status_code=413, detail="Too many operands.")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return body
+
 
-        db.add(new_calc)
+# ------------------------------------------------------------------------------
+# BATCH Calculations
+# ------------------------------------------------------------------------------
+@app.post(
+    "/calculations/batch",
+    response_model=CalculationBatchResponse,
+    tags=["calculations"]
+)
+def create_calculations_batch(
+    batch: CalculationBatchRequest,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Evaluate many calculations in one vectorized pass and persist the
+    successful ones in a single transaction. Invalid items are reported
+    per item with the same message the single-item route returns as 400.
+    """
+    outcomes = evaluate_batch((item.type, item.inputs) for item in batch.items)
+
+    ok_indices = [i for i, (_, error) in enumerate(outcomes) if error is None]
+    records = insert_calculations(
+        db,
+        current_user.id,
+        (
+            (normalize_type(batch.items[i].type), batch.items[i].inputs, outcomes[i][0])
+            for i in ok_indices
+        ),
+    )
+    if records:
+        apply_calculation_delta(
+            db, current_user.id,
+            added=[(r["type"], len(r["inputs"]), r["created_at"]) for r in records],
+        )
         db.commit()
-        db.refresh(new_calc)
-        return new_calc
 
+    results = [{"index": i, "error": error} for i, (_, error) in enumerate(outcomes)]
+    for i, record in zip(ok_indices, records):
+        results[i] = {"index": i, "id": record["id"], "result": record["result"]}
+
+    return {
+        "succeeded": len(records),
+        "failed": len(results) - len(records),
+        "items": results,
+    }
+
+
+# ------------------------------------------------------------------------------
+# BACKGROUND JOBS
+# ------------------------------------------------------------------------------
+@app.post(
+    "/calculations/jobs",
+    response_model=CalculationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["calculations"]
+)
+def create_calculation_job(
+    batch: CalculationBatchRequest,
+    response: Response,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue a batch for background evaluation and return immediately.
+    Poll the ``Location`` URL for progress and per-item results.
+    """
+    job = job_service.create_job(db, current_user.id, batch.items)
+    response.headers["Location"] = f"/calculations/jobs/{job.id}"
+    return job
+
+
+@app.get(
+    "/calculations/jobs/{job_id}",
+    response_model=CalculationJobResponse,
+    tags=["calculations"]
+)
+def read_calculation_job(
+    job_id: str,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    return job_service.get_job(db, current_user.id, job_id)
+
+
+# ------------------------------------------------------------------------------
+# BULK CREATE Calculations
+# ------------------------------------------------------------------------------
+@app.post(
+    "/calculations/bulk",
+    response_model=CalculationBulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["calculations"]
+)
+def bulk_create_calculations_route(
+    bulk: CalculationBulkCreate,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Insert a validated list of calculations in one transaction. Any failing
+    item rejects the whole request with 400.
+    """
+    try:
+        records = bulk_create_calculations(db, current_user.id, bulk.items)
+        apply_calculation_delta(
+            db, current_user.id,
+            added=[(r["type"], len(r["inputs"]), r["created_at"]) for r in records],
+        )
+        db.commit()
     except ValueError as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+    return {"created": len(records), "items": records}
+
 
 # ------------------------------------------------------------------------------
 # LIST Calculations
 # ------------------------------------------------------------------------------
 @app.get("/calculations", response_model=List[CalculationResponse], tags=["calculations"])
 def list_calculations(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque token from X-Next-Cursor"),
+    calc_type: Optional[List[CalculationType]] = Query(None, alias="type"),
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    return db.query(Calculation).filter(
-        Calculation.user_id == current_user.id
-    ).all()
+    """
+    One page of the user's calculations, newest first (``limit`` defaults
+    to 100). When more rows exist the token for the next page is returned
+    in ``X-Next-Cursor``, and the full next-page URL in ``Link: rel="next"``.
+    Rows go straight to ``dump_calculations``; ``response_model`` only
+    documents the shape. Honors If-None-Match / If-Modified-Since.
+    """
+    validators = conditional.lookup(db, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    rows, next_cursor = calculation_service.list_calculations(
+        db,
+        current_user.id,
+        limit,
+        cursor,
+        types=calc_type,
+        min_result=min_result,
+        max_result=max_result,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    response = Response(dump_calculations(rows), media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = next_page_link(request.url, next_cursor)
+    conditional.set_headers(response, validators)
+    return response
 
 
 # ------------------------------------------------------------------------------
@@ -230,52 +577,64 @@ def list_calculations(
 # ------------------------------------------------------------------------------
 @app.get("/calculations/stats", response_model=CalculationStats, tags=["calculations"])
 def get_statistics(
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    return compute_user_stats(db, current_user.id)
+    validators = conditional.lookup(db, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        return cached
+
+    conditional.set_headers(response, validators)
+    return calculation_service.get_stats(db, current_user.id)
 
 
 # ------------------------------------------------------------------------------
-# EXPORT CSV
+# EXPORT (CSV / NDJSON, optionally gzip)
 # ------------------------------------------------------------------------------
 @app.get("/calculations/export", tags=["calculations"])
 @app.get("/calculations/report.csv", tags=["calculations"])
-def export_calculations_csv(
+def export_calculations(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson", "csv.gz", "ndjson.gz"]] = None,
+    calc_type: Optional[List[CalculationType]] = Query(None, alias="type"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    import io, csv
-
-    records = (
-        db.query(Calculation)
-        .filter(Calculation.user_id == current_user.id)
-        .order_by(Calculation.created_at.asc())
-        .all()
+    """
+    Stream the user's history. The encoding comes from ``format`` or the
+    Accept header; Accept-Encoding: gzip compresses the stream in flight.
+    Type and date filters are applied in the database query.
+    """
+    export_format = negotiate_export(
+        format,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
     )
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(["id", "type", "inputs", "result", "created_at"])
-
-    for rec in records:
-        writer.writerow([
-            str(rec.id),
-            rec.type,
-            ", ".join(str(x) for x in (rec.inputs or [])),
-            rec.result,
-            rec.created_at.isoformat() if rec.created_at else "",
-        ])
-
-    output.seek(0)
-
-    filename = f"calculations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filename = f"calculations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format.extension}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if export_format.content_encoding:
+        headers["Content-Encoding"] = export_format.content_encoding
 
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        stream_export(
+            db,
+            current_user.id,
+            export_format,
+            types=calc_type,
+            created_after=created_after,
+            created_before=created_before,
+        ),
+        media_type=export_format.media_type,
+        headers=headers,
     )
 
 
@@ -285,23 +644,20 @@ def export_calculations_csv(
 @app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
 def get_calculation(
     calc_id: str,
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
-
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
+    validators = conditional.lookup(db, request, current_user.id)
+    cached = conditional.not_modified(request, validators)
+    if cached is not None:
+        # A missing or foreign id is still a 404, even for "If-None-Match: *"
+        calculation_service.check_owned(db, current_user.id, calc_id)
+        return cached
 
-    if not calculation:
-        raise HTTPException(status_code=404, detail="Calculation not found.")
-
-    return calculation
+    conditional.set_headers(response, validators)
+    return calculation_service.get_calculation(db, current_user.id, calc_id)
 
 
 # ------------------------------------------------------------------------------
@@ -314,27 +670,9 @@ def update_calculation(
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
-
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
-
-    if not calculation:
-        raise HTTPException(status_code=404, detail="Calculation not found.")
-
-    if calculation_update.inputs is not None:
-        calculation.inputs = calculation_update.inputs
-        calculation.result = calculation.get_result()
-
-    calculation.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(calculation)
-    return calculation
+    return calculation_service.update_calculation(
+        db, current_user.id, calc_id, calculation_update
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -346,21 +684,7 @@ def delete_calculation(
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    try:
-        calc_uuid = UUID(calc_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
-
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
-
-    if not calculation:
-        raise HTTPException(status_code=404, detail="Calculation not found.")
-
-    db.delete(calculation)
-    db.commit()
+    calculation_service.delete_calculation(db, current_user.id, calc_id)
     return None
 
 
@@ -1,2 +1,5 @@
 from app.models.user import User
-from app.models.calculation import Calculation 
+from app.models.calculation import Calculation
+from app.models.user_stats import UserCalculationStats
+from app.models.revoked_token import RevokedToken
+from app.models.calculation_job import CalculationJob, CalculationJobResult
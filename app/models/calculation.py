@@ -2,13 +2,58 @@
 Calculation Models Module
 """
 
+from array import array
 from datetime import datetime
 import uuid
 from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float, Index, Integer, LargeBinary, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, declared_attr
+from sqlalchemy.orm import relationship, declared_attr, validates
+from sqlalchemy.types import TypeDecorator
+from app.core.config import settings
 from app.database import Base
+from app.operations import power
+
+
+# Operand containers the Calculation subclasses accept: JSON storage loads
+# lists, binary storage loads array('d')
+INPUT_SEQUENCES = (list, array)
+
+
+class PackedFloats(TypeDecorator):
+    """
+    Calculation operands, stored per ``CALC_INPUTS_STORAGE``:
+
+    - ``json``: a JSON array (the original layout).
+    - ``binary``: packed native float64s. Loading is a single memcpy into
+      an ``array('d')``; no per-element parsing happens until a caller
+      actually iterates the values.
+
+    Reads accept either encoding, so rows survive a storage switch on
+    databases with flexible column typing.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if settings.CALC_INPUTS_STORAGE == "binary":
+            return dialect.type_descriptor(LargeBinary())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if settings.CALC_INPUTS_STORAGE == "binary":
+            return array("d", value).tobytes()
+        return value.tolist() if isinstance(value, array) else value
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            packed = array("d")
+            packed.frombytes(value)
+            return packed
+        return value
 
 
 class AbstractCalculation:
@@ -35,7 +80,12 @@ class AbstractCalculation:
 
     @declared_attr
     def inputs(cls):
-        return Column(JSON, nullable=False)
+        return Column(PackedFloats, nullable=False)
+
+    @declared_attr
+    def operand_count(cls):
+        # Denormalized len(inputs) so aggregates never decode the operands
+        return Column(Integer, nullable=True)
 
     @declared_attr
     def result(cls):
@@ -52,6 +102,11 @@ class AbstractCalculation:
 
 class Calculation(Base, AbstractCalculation):
 
+    # Serves keyset pagination: WHERE user_id = ? ORDER BY created_at, id
+    __table_args__ = (
+        Index("ix_calculations_user_created_id", "user_id", "created_at", "id"),
+    )
+
     __mapper_args__ = {
         "polymorphic_on": "type",
         "polymorphic_identity": "calculation",
@@ -62,6 +117,11 @@ class Calculation(Base, AbstractCalculation):
     def __repr__(self):
         return f"<Calculation(type={self.type}, inputs={self.inputs})>"
 
+    @validates("inputs")
+    def _track_operand_count(self, key, value):
+        self.operand_count = len(value) if isinstance(value, INPUT_SEQUENCES) else None
+        return value
+
 
     @staticmethod
     def create(calculation_type: str, user_id, inputs):
@@ -76,17 +136,7 @@ class Calculation(Base, AbstractCalculation):
         calc_key = calculation_type.strip().lower()
         print("NORMALIZED TYPE:", calc_key)
 
-        mapping = {
-            "addition": Addition,
-            "subtraction": Subtraction,
-            "multiplication": Multiplication,
-            "division": Division,
-            "exponentiation": Exponentiation,
-            "power": Power,
-            "modulus": Modulus,
-        }
-
-        cls = mapping.get(calc_key)
+        cls = CALCULATION_TYPES.get(calc_key)
         print("MAPPING RESULT:", cls)
 
         if cls is None:
@@ -105,7 +155,7 @@ class Addition(Calculation):
     __mapper_args__ = {"polymorphic_identity": "addition"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -116,7 +166,7 @@ class Subtraction(Calculation):
     __mapper_args__ = {"polymorphic_identity": "subtraction"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -130,7 +180,7 @@ class Multiplication(Calculation):
     __mapper_args__ = {"polymorphic_identity": "multiplication"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -144,7 +194,7 @@ class Division(Calculation):
     __mapper_args__ = {"polymorphic_identity": "division"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -160,11 +210,12 @@ class Exponentiation(Calculation):
     __mapper_args__ = {"polymorphic_identity": "exponentiation"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list with at least two numbers.")
         result = self.inputs[0]
         for v in self.inputs[1:]:
-            result = result ** v
+            # Bounds every intermediate of a chain such as [10, 10, 10, 10]
+            result = power(result, v, settings.CALC_MAX_RESULT_DIGITS)
         return float(result)
 
 
@@ -172,21 +223,43 @@ class Power(Calculation):
     __mapper_args__ = {"polymorphic_identity": "power"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) != 2:
             raise ValueError("Power requires exactly 2 values.")
-        return float(self.inputs[0] ** self.inputs[1])
+        return float(power(self.inputs[0], self.inputs[1], settings.CALC_MAX_RESULT_DIGITS))
 
 
 class Modulus(Calculation):
     __mapper_args__ = {"polymorphic_identity": "modulus"}
 
     def get_result(self):
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, INPUT_SEQUENCES):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) != 2:
             raise ValueError("Modulus operation requires exactly two numbers")
         if self.inputs[1] == 0:
             raise ValueError("Modulus by zero undefined.")
         return float(self.inputs[0] % self.inputs[1])
+
+
+# Factory registry: normalized type name -> subclass
+CALCULATION_TYPES = {
+    "addition": Addition,
+    "subtraction": Subtraction,
+    "multiplication": Multiplication,
+    "division": Division,
+    "exponentiation": Exponentiation,
+    "power": Power,
+    "modulus": Modulus,
+}
+
+
+def operand_count_sql():
+    """
+    Per-row operand count for SQL aggregates. Rows written before
+    ``operand_count`` existed fall back to measuring the stored inputs.
+    """
+    if settings.CALC_INPUTS_STORAGE == "binary":
+        return func.coalesce(Calculation.operand_count, func.length(Calculation.inputs) / 8)
+    return func.coalesce(Calculation.operand_count, func.json_array_length(Calculation.inputs))
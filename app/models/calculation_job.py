@@ -0,0 +1,86 @@
+"""
+Calculation Job Model
+"""
+
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class CalculationJob(Base):
+    """
+    A batch of calculations computed in the background.
+
+    ``items`` holds the submitted ``{"type", "inputs"}`` entries. Workers
+    process them in chunks; each chunk's calculations, its ``results`` rows
+    and the ``processed`` offset commit together, so a job interrupted by a
+    restart resumes where it stopped without inserting anything twice.
+    ``heartbeat_at`` is bumped while a worker runs the job and lets workers
+    spot jobs orphaned by a dead process; ``claim_token`` identifies the
+    worker's claim, so a worker whose job was requeued and claimed again
+    cannot commit over the new owner.
+    """
+
+    __tablename__ = "calculation_jobs"
+
+    # Workers pick the oldest queued job: WHERE status = ? ORDER BY created_at
+    __table_args__ = (
+        Index("ix_calculation_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status = Column(String(20), nullable=False, default="queued")
+    items = Column(JSON, nullable=False)
+    total = Column(Integer, nullable=False)
+    processed = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    claim_token = Column(String(32), nullable=True)
+
+    results = relationship(
+        "CalculationJobResult",
+        order_by="CalculationJobResult.index",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    def __repr__(self):
+        return f"<CalculationJob(id={self.id}, status={self.status}, {self.processed}/{self.total})>"
+
+
+class CalculationJobResult(Base):
+    """
+    Outcome of one job item: the stored calculation's id and result, or the
+    error. One row per item, so a chunk only inserts its own rows instead
+    of rewriting everything before it.
+    """
+
+    __tablename__ = "calculation_job_results"
+
+    job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("calculation_jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    index = Column("item_index", Integer, primary_key=True, autoincrement=False)
+    # The created calculation (named ``id`` like ``CalculationBatchItemResult``)
+    id = Column("calculation_id", UUID(as_uuid=True), nullable=True)
+    result = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"<CalculationJobResult(job_id={self.job_id}, index={self.index})>"
@@ -0,0 +1,24 @@
+"""
+Revoked Token Model
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class RevokedToken(Base):
+    """
+    One row per revoked JWT, keyed by its ``jti``. Rows are only needed
+    until the token would have expired anyway, so ``expires_at`` drives
+    pruning.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, expires_at={self.expires_at})>"
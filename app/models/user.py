@@ -161,17 +161,10 @@ class User(Base):
         return get_password_hash(password)
 
     @classmethod
-    def register(cls, db, user_data: dict):
+    def check_registration(cls, db, user_data: dict) -> None:
         """
-        Register a new user.
+        Validate registration data before any hashing is done.
 
-        Args:
-            db: SQLAlchemy database session
-            user_data: Dictionary containing user registration data
-            
-        Returns:
-            User: The newly created user instance
-            
         Raises:
             ValueError: If password is invalid or username/email already exists
         """
@@ -185,9 +178,29 @@ class User(Base):
         ).first()
         if existing_user:
             raise ValueError("Username or email already exists")
-        
+
+    @classmethod
+    def register(cls, db, user_data: dict, hashed_password: str = None):
+        """
+        Register a new user.
+
+        Args:
+            db: SQLAlchemy database session
+            user_data: Dictionary containing user registration data
+            hashed_password: Hash of ``user_data["password"]`` if the caller
+                already computed it (the async route does, off the threadpool)
+            
+        Returns:
+            User: The newly created user instance
+            
+        Raises:
+            ValueError: If password is invalid or username/email already exists
+        """
+        cls.check_registration(db, user_data)
+
         # Create new user instance
-        hashed_password = cls.hash_password(password)
+        if hashed_password is None:
+            hashed_password = cls.hash_password(user_data["password"])
         user = cls(
             first_name=user_data["first_name"],
             last_name=user_data["last_name"],
@@ -213,20 +226,36 @@ class User(Base):
         Returns:
             dict: Authentication result with tokens and user data, or None if authentication fails
         """
-        user = db.query(cls).filter(
-            or_(cls.username == username_or_email, cls.email == username_or_email)
-        ).first()
+        user = cls.find_by_login(db, username_or_email)
 
         if not user or not user.verify_password(password):
             return None
 
+        return user.issue_tokens(db)
+
+    @classmethod
+    def find_by_login(cls, db, username_or_email: str):
+        """Return the user whose username or email is ``username_or_email``, or None."""
+        return db.query(cls).filter(
+            or_(cls.username == username_or_email, cls.email == username_or_email)
+        ).first()
+
+    def issue_tokens(self, db) -> dict:
+        """
+        Record a successful login and create its tokens (the caller has
+        already checked the password).
+
+        Returns:
+            dict: Authentication result with tokens and user data
+        """
         # Update the last_login timestamp
-        user.last_login = utcnow()
+        self.last_login = utcnow()
         db.flush()
 
         # Generate tokens
-        access_token = cls.create_access_token({"sub": str(user.id)})
-        refresh_token = cls.create_refresh_token({"sub": str(user.id)})
+        cls = type(self)
+        access_token = cls.create_access_token({"sub": str(self.id)})
+        refresh_token = cls.create_refresh_token({"sub": str(self.id)})
         expires_at = utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         return {
@@ -234,7 +263,7 @@ class User(Base):
             "refresh_token": refresh_token,
             "token_type": "bearer",
             "expires_at": expires_at,
-            "user": user
+            "user": self
         }
 
     @classmethod
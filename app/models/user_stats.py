@@ -0,0 +1,33 @@
+"""
+User Calculation Statistics Model
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class UserCalculationStats(Base):
+    """
+    Running per-user totals, maintained in the same transaction as every
+    calculation write so the stats endpoint is a primary-key read.
+    """
+
+    __tablename__ = "user_calculation_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    total_count = Column(Integer, nullable=False, default=0)
+    type_counts = Column(JSON, nullable=False, default=dict)
+    operand_sum = Column(Integer, nullable=False, default=0)
+    last_calculation_at = Column(DateTime, nullable=True)
+    # Bumped on every write to the user's calculations; drives ETags
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserCalculationStats(user_id={self.user_id}, total={self.total_count})>"
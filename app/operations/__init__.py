@@ -12,17 +12,22 @@ Functions:
 - subtract(a: Union[int, float], b: Union[int, float]) -> Union[int, float]: Returns the difference when b is subtracted from a.
 - multiply(a: Union[int, float], b: Union[int, float]) -> Union[int, float]: Returns the product of a and b.
 - divide(a: Union[int, float], b: Union[int, float]) -> float: Returns the quotient when a is divided by b. Raises ValueError if b is zero.
+- power(a: Union[int, float], b: Union[int, float], max_digits: float) -> Union[int, float]: Returns a raised to b. Raises ValueError if the result would exceed max_digits decimal digits.
 
 Usage:
 These functions can be imported and used in other modules or integrated into APIs
 to perform arithmetic operations based on user input.
 """
 
+import math
 from typing import Union  # Import Union for type hinting multiple possible types
 
 # Define a type alias for numbers that can be either int or float
 Number = Union[int, float]
 
+# Largest finite float is ~1.8e308, so results stored as floats never need more digits
+FLOAT_MAX_DIGITS = math.log10(1.7976931348623157e308)
+
 def add(a: Number, b: Number) -> Number:
     """
     Add two numbers and return the result.
@@ -118,3 +123,40 @@ def divide(a: Number, b: Number) -> float:
     # Perform division of a by b and return the result as a float
     result = a / b
     return result
+
+def power(a: Number, b: Number, max_digits: float = FLOAT_MAX_DIGITS) -> Number:
+    """
+    Raise a to the power b, refusing results larger than max_digits digits.
+
+    The magnitude is estimated as b * log10(|a|) before anything is
+    computed, so a huge integer power (10 ** 10 ** 10) is rejected in
+    constant time instead of tying up the worker building the number.
+
+    Parameters:
+    - a (int or float): The base.
+    - b (int or float): The exponent.
+    - max_digits (float): Largest allowed result, in decimal digits.
+
+    Returns:
+    - int or float: a ** b.
+
+    Raises:
+    - ValueError: If the result would have more than max_digits digits.
+
+    Example:
+    >>> power(2, 10)
+    1024
+    >>> power(10, 400)
+    Traceback (most recent call last):
+        ...
+    ValueError: Result is too large.
+    """
+    # Projected size of the result; only |a| > 1 with b > 0 can grow
+    if b > 0 and abs(a) > 1 and b * math.log10(abs(a)) > max_digits:
+        raise ValueError("Result is too large.")
+
+    try:
+        return a ** b
+    except OverflowError:
+        # Float powers just under the digit budget can still overflow
+        raise ValueError("Result is too large.")
@@ -14,7 +14,14 @@ from .calculation import (
     CalculationBase,
     CalculationCreate,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    CalculationBatchItem,
+    CalculationBatchRequest,
+    CalculationBatchItemResult,
+    CalculationBatchResponse,
+    CalculationBulkCreate,
+    CalculationBulkItem,
+    CalculationBulkCreateResponse
 )
 
 __all__ = [
@@ -32,4 +39,11 @@ __all__ = [
     'CalculationCreate',
     'CalculationUpdate',
     'CalculationResponse',
+    'CalculationBatchItem',
+    'CalculationBatchRequest',
+    'CalculationBatchItemResult',
+    'CalculationBatchResponse',
+    'CalculationBulkCreate',
+    'CalculationBulkItem',
+    'CalculationBulkCreateResponse',
 ]
\ No newline at end of file
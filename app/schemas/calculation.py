@@ -2,12 +2,23 @@
 Calculation Schemas Module
 """
 
+from array import array
 from enum import Enum
-from pydantic import BaseModel, Field, ConfigDict, model_validator, field_validator
-from typing import List, Optional
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
+from typing import Annotated, List, Literal, Optional
 from uuid import UUID
 from datetime import datetime
 
+from app.core.config import settings
+
 
 class CalculationType(str, Enum):
     ADDITION = "addition"
@@ -36,8 +47,11 @@ class CalculationBase(BaseModel):
     def check_inputs_is_list(cls, v):
         """
         Allow ANY list shape; length rules handled inside business logic
-        to produce 400 instead of 422.
+        to produce 400 instead of 422. Packed operands loaded from binary
+        storage are unpacked here, only when a response needs them.
         """
+        if isinstance(v, array):
+            return v.tolist()
         if not isinstance(v, list):
             raise ValueError("Input should be a valid list.")
         return v
@@ -83,7 +97,19 @@ class CalculationUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class CalculationResponse(CalculationBase):
+def _unpack_inputs(v):
+    """Binary storage loads operands as ``array('d')``; responses send a list."""
+    return v.tolist() if isinstance(v, array) else v
+
+
+class CalculationResponse(BaseModel):
+    """
+    Outgoing calculation. Data comes from stored rows that were validated
+    on the way in, so this model deliberately does not inherit
+    ``CalculationBase`` and re-run its input validators per response.
+    """
+    type: CalculationType
+    inputs: Annotated[List[float], BeforeValidator(_unpack_inputs)]
     id: UUID
     user_id: UUID
     created_at: datetime
@@ -91,3 +117,112 @@ class CalculationResponse(CalculationBase):
     result: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Built once: constructing the adapter compiles its validator and serializer
+calculation_list_adapter = TypeAdapter(List[CalculationResponse])
+
+
+def dump_calculations(rows) -> bytes:
+    """
+    Serialize ORM instances or Core rows to JSON bytes in the
+    ``List[CalculationResponse]`` shape, in a single pydantic-core pass.
+    Rows are validated against the response model first, so a row that
+    breaks the contract (e.g. a NULL ``result``) fails instead of being
+    sent as is.
+    """
+    return calculation_list_adapter.dump_json(
+        calculation_list_adapter.validate_python(rows, from_attributes=True)
+    )
+
+
+class CalculationPackedResponse(BaseModel):
+    """Created calculation from a packed body; operands are not echoed back."""
+    id: UUID
+    user_id: UUID
+    type: str
+    operand_count: int
+    result: float
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CalculationBatchItem(BaseModel):
+    """
+    One entry of a batch request. The type is checked per item by the
+    batch evaluator so a bad entry yields an item error, not a 422.
+    """
+    type: str = Field(..., example="addition")
+    inputs: List[float] = Field(..., example=[1, 2])
+
+
+class CalculationBatchRequest(BaseModel):
+    items: List[CalculationBatchItem] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_ITEMS,
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"type": "addition", "inputs": [1, 2]},
+                    {"type": "division", "inputs": [10, 0]},
+                ]
+            }
+        }
+    )
+
+
+class CalculationBatchItemResult(BaseModel):
+    index: int
+    id: Optional[UUID] = None
+    result: Optional[float] = None
+    error: Optional[str] = None
+
+
+class CalculationBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[CalculationBatchItemResult]
+
+
+class CalculationBulkCreate(BaseModel):
+    """All-or-nothing bulk insert of fully validated calculations."""
+    items: List[CalculationBase] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_ITEMS,
+    )
+
+
+class CalculationBulkItem(BaseModel):
+    id: UUID
+    result: float
+    created_at: datetime
+    updated_at: datetime
+
+
+class CalculationBulkCreateResponse(BaseModel):
+    created: int
+    items: List[CalculationBulkItem]
+
+
+class CalculationJobResponse(BaseModel):
+    """Status of a background batch; ``items`` fills in chunk by chunk."""
+    id: UUID
+    status: Literal["queued", "running", "succeeded", "failed"]
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: List[CalculationBatchItemResult] = Field(default_factory=list, validation_alias="results")
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
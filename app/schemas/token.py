@@ -2,6 +2,7 @@
 from enum import Enum
 from uuid import UUID
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 class TokenType(str, Enum):
@@ -69,3 +70,11 @@ class TokenResponse(BaseModel):
             }
         }
     )
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for a new access token."""
+    refresh_token: str = Field(..., description="JWT refresh token")
+
+class LogoutRequest(BaseModel):
+    """Optional body for logout; the refresh token is revoked alongside the access token."""
+    refresh_token: Optional[str] = Field(None, description="JWT refresh token to revoke")
@@ -0,0 +1,280 @@
+# app/services/batch_service.py
+
+"""
+Vectorized batch evaluation for calculations.
+
+Items are grouped by (type, operand count) so every group forms a dense
+2-D array that NumPy can fold column by column. The column fold mirrors the
+left-to-right loops in the ``Calculation`` subclasses, so results match the
+scalar ``get_result()`` path bit for bit.
+
+Rows that would fail validation (too few operands, zero divisor) or that
+produce a non-finite value are re-run through the scalar subclass so the
+exact ``ValueError`` (or arithmetic error) message is preserved. Those
+re-runs go through the calculation executor; a timeout or unavailable
+worker pool there becomes that item's error, not the whole batch's.
+"""
+
+import base64
+import binascii
+import uuid
+from collections import defaultdict
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.calculation import Calculation, CALCULATION_TYPES
+from app.services.calc_executor import WORKERS_UNAVAILABLE
+from app.services.result_cache import compute_result
+
+
+# (result, error) per input item, in request order
+BatchOutcome = Tuple[Optional[float], Optional[str]]
+
+# Operations that fold left-to-right over all operands
+_FOLD_OPS = {
+    "addition": np.add,
+    "subtraction": np.subtract,
+    "multiplication": np.multiply,
+    "division": np.true_divide,
+    "exponentiation": np.power,
+}
+
+# Operations that take exactly two operands
+_BINARY_OPS = {
+    "power": np.power,
+    "modulus": np.remainder,
+}
+
+# Errors the subclasses raise for invalid operands
+_CALCULATION_ERRORS = (ValueError, ArithmeticError, TypeError, IndexError)
+
+# Types whose subclass rejects fewer than two operands
+_MIN_TWO_OPERANDS = {"addition", "subtraction", "multiplication", "division"}
+
+
+def normalize_type(calculation_type) -> Optional[str]:
+    """Normalize a type name the same way ``Calculation.create`` does."""
+    if not isinstance(calculation_type, str):
+        return None
+    calc_key = calculation_type.strip().lower()
+    return calc_key if calc_key in CALCULATION_TYPES else None
+
+
+def evaluate_scalar(calc_key: str, inputs: list) -> BatchOutcome:
+    """
+    Evaluate one item through its ORM subclass, capturing the error message.
+    Used for rows the vectorized path cannot answer exactly.
+    """
+    calc = CALCULATION_TYPES[calc_key](inputs=list(inputs))
+    try:
+        return float(compute_result(calc)), None
+    except _CALCULATION_ERRORS as e:
+        return None, str(e)
+    except HTTPException as e:
+        # Executor timeout (504) or broken worker pool (503)
+        return None, e.detail
+    except BrokenProcessPool:
+        return None, WORKERS_UNAVAILABLE
+
+
+def _group_is_valid(calc_key: str, width: int) -> bool:
+    """Operand-count rules that apply to a whole (type, width) group."""
+    if calc_key in _MIN_TWO_OPERANDS:
+        return width >= 2
+    if calc_key in _BINARY_OPS:
+        return width == 2
+    # exponentiation only needs a first operand
+    return width >= 1
+
+
+def _evaluate_group(calc_key: str, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute one dense group. Returns (results, needs_scalar) where
+    ``needs_scalar`` flags rows that must be re-run through the subclass.
+    """
+    with np.errstate(all="ignore"):
+        if calc_key in _BINARY_OPS:
+            needs_scalar = matrix[:, 1] == 0 if calc_key == "modulus" else np.zeros(len(matrix), bool)
+            results = _BINARY_OPS[calc_key](matrix[:, 0], matrix[:, 1])
+        else:
+            op = _FOLD_OPS[calc_key]
+            if calc_key == "division":
+                needs_scalar = (matrix[:, 1:] == 0).any(axis=1)
+            else:
+                needs_scalar = np.zeros(len(matrix), bool)
+
+            # sum() and the multiplication loop start from 0 / 1
+            if calc_key == "addition":
+                results = 0.0 + matrix[:, 0]
+            elif calc_key == "multiplication":
+                results = 1.0 * matrix[:, 0]
+            else:
+                results = matrix[:, 0].copy()
+
+            for j in range(1, matrix.shape[1]):
+                results = op(results, matrix[:, j])
+
+    needs_scalar |= ~np.isfinite(results)
+    if calc_key in ("exponentiation", "power"):
+        # Let the scalar path apply the CALC_MAX_RESULT_DIGITS budget
+        limit = 10.0 ** min(settings.CALC_MAX_RESULT_DIGITS, 308)
+        needs_scalar |= np.abs(results) >= limit
+    return results, needs_scalar
+
+
+def decode_packed_inputs(body: bytes, encoding: str = "raw") -> np.ndarray:
+    """
+    View a packed request body as little-endian float64 operands without
+    copying (``encoding="base64"`` decodes the text first).
+
+    Raises:
+        ValueError: if the payload is not a whole number of finite float64s.
+    """
+    if encoding == "base64":
+        try:
+            body = base64.b64decode(body, validate=True)
+        except binascii.Error:
+            raise ValueError("Inputs are not valid base64.")
+    if len(body) % 8:
+        raise ValueError("Packed inputs must be a whole number of float64 values.")
+
+    values = np.frombuffer(body, dtype="<f8")
+    if not np.isfinite(values).all():
+        raise ValueError("Inputs must be finite numbers.")
+    return values
+
+
+def evaluate_vector(calc_key: str, values: np.ndarray) -> float:
+    """
+    Evaluate one calculation whose operands are already a float64 array
+    (packed request bodies with up to millions of operands).
+
+    ``ufunc.accumulate`` folds strictly left to right, like the subclass
+    loops, so the result matches ``get_result()`` exactly. Cases the fold
+    cannot answer exactly fall back to the scalar path for its error.
+
+    Raises:
+        ValueError: with the same message the subclass would raise.
+        HTTPException: 504 / 503 from the calculation executor.
+    """
+    if (
+        values.ndim == 1
+        and _group_is_valid(calc_key, len(values))
+        and not (calc_key == "division" and (values[1:] == 0).any())
+        and not (calc_key == "modulus" and values[1] == 0)
+    ):
+        with np.errstate(all="ignore"):
+            if calc_key in _BINARY_OPS:
+                result = _BINARY_OPS[calc_key](values[0], values[1])
+            else:
+                result = _FOLD_OPS[calc_key].accumulate(values)[-1]
+        limit = 10.0 ** min(settings.CALC_MAX_RESULT_DIGITS, 308)
+        if np.isfinite(result) and not (
+            calc_key in ("exponentiation", "power") and abs(result) >= limit
+        ):
+            return float(result)
+
+    calc = CALCULATION_TYPES[calc_key](inputs=values.tolist())
+    try:
+        return float(compute_result(calc))
+    except _CALCULATION_ERRORS as e:
+        raise ValueError(str(e))
+
+
+def evaluate_batch(items: Iterable[Tuple[str, Sequence[float]]]) -> List[BatchOutcome]:
+    """
+    Evaluate many ``(type, inputs)`` pairs in one pass.
+
+    Returns a list of ``(result, error)`` tuples aligned with ``items``;
+    exactly one of the two is set for each entry.
+    """
+    items = list(items)
+    outcomes: List[BatchOutcome] = [(None, None)] * len(items)
+
+    groups = defaultdict(list)
+    for index, (calculation_type, inputs) in enumerate(items):
+        calc_key = normalize_type(calculation_type)
+        if calc_key is None:
+            outcomes[index] = (None, "Unsupported calculation type")
+            continue
+        groups[(calc_key, len(inputs))].append(index)
+
+    for (calc_key, width), indices in groups.items():
+        if not _group_is_valid(calc_key, width):
+            for index in indices:
+                outcomes[index] = evaluate_scalar(calc_key, items[index][1])
+            continue
+
+        matrix = np.array([items[i][1] for i in indices], dtype=np.float64)
+        results, needs_scalar = _evaluate_group(calc_key, matrix)
+
+        for row, (index, value) in enumerate(zip(indices, results.tolist())):
+            if needs_scalar[row]:
+                outcomes[index] = evaluate_scalar(calc_key, items[index][1])
+            else:
+                outcomes[index] = (value, None)
+
+    return outcomes
+
+
+def insert_calculations(
+    db: Session,
+    user_id,
+    rows: Iterable[Tuple[str, Sequence[float], float]],
+) -> List[dict]:
+    """
+    Persist already-computed ``(type, inputs, result)`` rows with a single
+    executemany INSERT on the session's transaction.
+
+    Ids and timestamps are generated client-side so callers get them back
+    without a refresh SELECT per row. SQLAlchemy pages large executemany
+    batches into multi-row VALUES statements on both SQLite and Postgres.
+    The caller owns the commit.
+    """
+    now = datetime.utcnow()
+    records = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "type": calc_key,
+            "inputs": list(inputs),
+            "operand_count": len(inputs),
+            "result": result,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for calc_key, inputs, result in rows
+    ]
+    if records:
+        db.execute(insert(Calculation.__table__), records)
+    return records
+
+
+def bulk_create_calculations(db: Session, user_id, payloads) -> List[dict]:
+    """
+    Validate, compute and insert a list of ``CalculationBase`` payloads
+    all-or-nothing.
+
+    Raises:
+        ValueError: naming the first failing item, with the same message
+            the single-item route would return.
+    """
+    items = [(p.type.value, p.inputs) for p in payloads]
+    outcomes = evaluate_batch(items)
+
+    for index, (_, error) in enumerate(outcomes):
+        if error is not None:
+            raise ValueError(f"Item {index}: {error}")
+
+    return insert_calculations(
+        db,
+        user_id,
+        ((calc_key, inputs, value) for (calc_key, inputs), (value, _) in zip(items, outcomes)),
+    )
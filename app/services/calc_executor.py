@@ -0,0 +1,263 @@
+# app/services/calc_executor.py
+
+"""
+Execution backend for ``Calculation.get_result``.
+
+Most calculations are a handful of operands and run inline. Long operand
+chains and large powers are CPU-bound pure Python that holds the GIL, so
+running them in the request thread slows every other request on the
+worker. Calculations whose estimated cost reaches ``CALC_OFFLOAD_MIN_COST``
+are instead sent to a small process pool (``CALC_PROCESS_WORKERS``), with a
+``CALC_TASK_TIMEOUT`` deadline per task.
+
+A task that misses its deadline is cancelled if it has not started. If it
+is already running, the pool is retired: new work goes to a fresh pool,
+and the old one is terminated only after its other tasks have finished
+or passed their own deadlines, so one runaway calculation never fails
+anyone else's. The caller gets a 504 either way. A pool that breaks (a
+worker died) is retired the same way and its callers get a 503.
+
+``run_async`` is the event-loop variant: it awaits the pool's future
+instead of blocking a thread on it.
+
+``ValueError``s raised in the worker are pickled back unchanged, so error
+messages match the inline path.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, register_source
+from app.models.calculation import CALCULATION_TYPES, INPUT_SEQUENCES
+
+
+# Async callers evaluate calculations up to this cost on the event loop;
+# a handful of operands is cheaper to compute than to hand to a thread
+ASYNC_INLINE_MAX_COST = 1000.0
+
+WORKERS_UNAVAILABLE = "Calculation workers unavailable, please retry."
+
+
+def estimate_cost(calc_key: str, inputs) -> float:
+    """
+    Rough CPU cost of a calculation in "operand units": one per operand,
+    plus the projected digit count of every power step (big-int powers
+    cost roughly in proportion to the size of their result).
+    """
+    if not isinstance(inputs, INPUT_SEQUENCES):
+        return 0.0
+    cost = float(len(inputs))
+    if calc_key in ("exponentiation", "power") and inputs:
+        magnitude = 0.0
+        try:
+            magnitude = math.log10(abs(inputs[0])) if inputs[0] else 0.0
+            for v in inputs[1:]:
+                magnitude *= v
+                cost += max(magnitude, 0.0)
+        except (TypeError, ValueError, OverflowError):
+            return cost
+    return cost
+
+
+def _evaluate(calc_key: str, inputs: list) -> float:
+    """Process-pool entry point: rebuild the subclass and evaluate it."""
+    return CALCULATION_TYPES[calc_key](inputs=inputs).get_result()
+
+
+class CalculationExecutor:
+    """Runs cheap calculations inline and expensive ones on a process pool."""
+
+    def __init__(self, max_workers: int, min_cost: float, timeout: float):
+        self.max_workers = max_workers
+        self.min_cost = min_cost
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        # pool -> futures submitted to it and not finished yet
+        self._inflight: Dict[ProcessPoolExecutor, Set[Future]] = {}
+
+        self.offloaded = Counter()
+        self.timeouts = Counter()
+        self.broken = Counter()
+        self.execution_time: Dict[str, Histogram] = {}
+
+    def run(self, calculation) -> float:
+        """``calculation.get_result()``, offloaded when its estimated cost is high."""
+        calc_key = type(calculation).__mapper__.polymorphic_identity
+        start = time.perf_counter()
+        try:
+            if self.max_workers <= 0 or estimate_cost(calc_key, calculation.inputs) < self.min_cost:
+                return calculation.get_result()
+            return self._run_in_pool(calc_key, list(calculation.inputs))
+        finally:
+            self._histogram(calc_key).observe(time.perf_counter() - start)
+
+    async def run_async(self, calculation) -> float:
+        """
+        ``run`` for the event loop. Trivial calculations run inline; the rest
+        run on the threadpool, or on the process pool above ``min_cost``,
+        whose future is awaited rather than blocked on.
+        """
+        calc_key = type(calculation).__mapper__.polymorphic_identity
+        start = time.perf_counter()
+        try:
+            cost = estimate_cost(calc_key, calculation.inputs)
+            if cost <= ASYNC_INLINE_MAX_COST:
+                return calculation.get_result()
+            if self.max_workers <= 0 or cost < self.min_cost:
+                return await run_in_threadpool(calculation.get_result)
+
+            pool, future = self._submit(calc_key, list(calculation.inputs))
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                raise self._timed_out(pool, future)
+            except BrokenProcessPool:
+                raise self._broken(pool)
+            finally:
+                self._dequeue()
+        finally:
+            self._histogram(calc_key).observe(time.perf_counter() - start)
+
+    def _run_in_pool(self, calc_key: str, inputs: list) -> float:
+        pool, future = self._submit(calc_key, inputs)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise self._timed_out(pool, future)
+        except BrokenProcessPool:
+            raise self._broken(pool)
+        finally:
+            self._dequeue()
+
+    def _submit(self, calc_key: str, inputs: list) -> Tuple[ProcessPoolExecutor, Future]:
+        pool = self._get_pool()
+        try:
+            future = pool.submit(_evaluate, calc_key, inputs)
+        except (BrokenProcessPool, RuntimeError):
+            # Broken, or retired by another thread between get and submit:
+            # one retry on a fresh pool
+            self._retire(pool)
+            pool = self._get_pool()
+            try:
+                future = pool.submit(_evaluate, calc_key, inputs)
+            except (BrokenProcessPool, RuntimeError):
+                raise self._broken(pool)
+
+        self.offloaded.inc()
+        with self._lock:
+            self._queued += 1
+            self._inflight.setdefault(pool, set()).add(future)
+        future.add_done_callback(lambda done: self._forget(pool, done))
+        return pool, future
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self._queued -= 1
+
+    def _forget(self, pool: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            futures = self._inflight.get(pool)
+            if futures is not None:
+                futures.discard(future)
+
+    def _timed_out(self, pool: ProcessPoolExecutor, future: Future) -> HTTPException:
+        self.timeouts.inc()
+        if not future.cancel() and not future.done():
+            self._retire(pool)
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Calculation timed out.",
+        )
+
+    def _broken(self, pool: ProcessPoolExecutor) -> HTTPException:
+        self.broken.inc()
+        self._retire(pool)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=WORKERS_UNAVAILABLE,
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _retire(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Stop sending work to ``pool`` (the next call builds a new one) and
+        reap it in the background once its other tasks are done.
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return  # already retired
+            self._pool = None
+        threading.Thread(target=self._reap, args=(pool,), name="calc-pool-reaper", daemon=True).start()
+
+    def _reap(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Let the retired pool's other tasks finish, then terminate whatever
+        is still running. Every task was submitted before the pool was
+        retired, so after one more ``timeout`` each remaining task is past
+        its own deadline and its caller has already had a 504.
+        """
+        with self._lock:
+            pending = list(self._inflight.get(pool, ()))
+        wait(pending, timeout=self.timeout)
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((pool._processes or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._inflight.pop(pool, None)
+
+    def _histogram(self, calc_key: str) -> Histogram:
+        histogram = self.execution_time.get(calc_key)
+        if histogram is None:
+            histogram = self.execution_time.setdefault(calc_key, Histogram())
+        return histogram
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self._queued,
+            "offloaded": self.offloaded.value,
+            "timeouts": self.timeouts.value,
+            "broken_pools": self.broken.value,
+            "execution_seconds": {
+                calc_key: histogram.snapshot()
+                for calc_key, histogram in list(self.execution_time.items())
+            },
+        }
+
+
+calculation_executor = CalculationExecutor(
+    max_workers=settings.CALC_PROCESS_WORKERS,
+    min_cost=settings.CALC_OFFLOAD_MIN_COST,
+    timeout=settings.CALC_TASK_TIMEOUT,
+)
+
+register_source("calc_executor", calculation_executor.stats)
@@ -0,0 +1,122 @@
+# app/services/calculation_query.py
+
+"""
+Shared filtering and keyset pagination for calculation listings.
+
+Listings are ordered newest first by ``(created_at, id)``, which matches
+the composite ``(user_id, created_at, id)`` index on ``calculations``. The
+cursor is an opaque url-safe token holding the last row's sort key, so a
+page costs one index range scan no matter how deep the client has paged.
+
+Pages are read as plain Core rows of ``LIST_COLUMNS`` rather than
+polymorphic ORM instances: no identity map and no per-row mapper or
+subclass construction. Routes serialize the rows directly with
+``dump_calculations``.
+"""
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select
+
+from app.models.calculation import Calculation
+
+
+# Columns a listing returns: exactly the fields of ``CalculationResponse``
+LIST_COLUMNS = (
+    Calculation.id,
+    Calculation.user_id,
+    Calculation.type,
+    Calculation.inputs,
+    Calculation.result,
+    Calculation.created_at,
+    Calculation.updated_at,
+)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Calculation timestamps are stored as naive UTC."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(created_at: datetime, calc_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(calc_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, UUID]:
+    """
+    Raises:
+        ValueError: if the token was not produced by ``encode_cursor``.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, calc_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(calc_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+def filter_calculations(
+    query,
+    user_id,
+    types: Optional[Iterable[str]] = None,
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    Apply ownership and optional filters to an ORM ``Query`` or a Core
+    ``Select`` over calculations (both accept ``.filter``).
+    """
+    query = query.filter(Calculation.user_id == user_id)
+    if types:
+        query = query.filter(Calculation.type.in_([getattr(t, "value", t) for t in types]))
+    if min_result is not None:
+        query = query.filter(Calculation.result >= min_result)
+    if max_result is not None:
+        query = query.filter(Calculation.result <= max_result)
+    if created_after is not None:
+        query = query.filter(Calculation.created_at >= _naive_utc(created_after))
+    if created_before is not None:
+        query = query.filter(Calculation.created_at < _naive_utc(created_before))
+    return query
+
+
+def after_cursor(query, cursor: Optional[str]):
+    """Order newest first and skip everything up to and including ``cursor``."""
+    if cursor:
+        created_at, calc_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Calculation.created_at < created_at,
+            and_(Calculation.created_at == created_at, Calculation.id < calc_id),
+        ))
+    return query.order_by(Calculation.created_at.desc(), Calculation.id.desc())
+
+
+def list_statement(user_id, **filters):
+    """Column-only SELECT of ``LIST_COLUMNS`` with ownership and filters applied."""
+    return filter_calculations(select(*LIST_COLUMNS), user_id, **filters)
+
+
+def next_page_link(url, cursor: str) -> str:
+    """RFC 8288 ``Link`` header value pointing at the page after ``url``."""
+    return f'<{url.include_query_params(cursor=cursor)}>; rel="next"'
+
+
+def paginate(db, stmt, cursor: Optional[str], limit: int):
+    """
+    Execute one page of ``stmt`` (a Core ``Select``) and return
+    ``(rows, next_cursor)``. ``next_cursor`` is None on the last page.
+    """
+    rows = db.execute(after_cursor(stmt, cursor).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
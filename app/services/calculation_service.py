@@ -0,0 +1,313 @@
+# app/services/calculation_service.py
+
+"""
+Calculation CRUD shared by the sync routes and the async routes.
+
+Each function owns its transaction (commit + refresh), so the async
+routes can run it unchanged through ``AsyncSession.run_sync`` and get back
+fully loaded objects that are safe to serialize outside the greenlet.
+Creates and updates are split into ``build_calculation``/``compute`` and
+``store_calculation``/``store_update`` so the async routes can compute
+with ``compute_async`` and only ``run_sync`` the database part.
+
+Writes use ``INSERT/UPDATE/DELETE ... RETURNING`` with the ownership check
+in the WHERE clause when the dialect supports it (Postgres, SQLite 3.35+),
+and hand back the returned row: one statement and one commit, and nothing
+for expire-on-commit to reload. Older dialects keep the ORM path.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.calculation import Calculation, operand_count_sql
+from app.services.batch_service import evaluate_vector
+from app.services.calculation_query import list_statement, paginate
+from app.services.result_cache import compute_result, compute_result_async
+from app.services.user_stats_service import apply_calculation_delta, get_user_stats
+
+
+CALCULATIONS = Calculation.__table__
+
+# Columns RETURNING hands back; the rows serialize like ORM instances
+RETURNED_COLUMNS = (
+    CALCULATIONS.c.id,
+    CALCULATIONS.c.user_id,
+    CALCULATIONS.c.type,
+    CALCULATIONS.c.inputs,
+    CALCULATIONS.c.operand_count,
+    CALCULATIONS.c.result,
+    CALCULATIONS.c.created_at,
+    CALCULATIONS.c.updated_at,
+)
+
+
+def _parse_id(calc_id: str) -> UUID:
+    try:
+        return UUID(calc_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+
+
+def _owned(db: Session, user_id, calc_id: str) -> Calculation:
+    calculation = db.query(Calculation).filter(
+        Calculation.id == _parse_id(calc_id),
+        Calculation.user_id == user_id
+    ).first()
+
+    if not calculation:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    return calculation
+
+
+def _returning(db: Session, statement: str) -> bool:
+    """Whether the session's dialect supports ``<statement> ... RETURNING``."""
+    return getattr(db.get_bind().dialect, f"{statement}_returning", False)
+
+
+def _insert_returning(db: Session, user_id, calc_key: str, inputs, operand_count: int, result):
+    """One INSERT ... RETURNING plus the stats delta; the caller commits."""
+    now = datetime.utcnow()
+    row = db.execute(
+        insert(CALCULATIONS).values(
+            id=uuid4(),
+            user_id=user_id,
+            type=calc_key,
+            inputs=inputs,
+            operand_count=operand_count,
+            result=result,
+            created_at=now,
+            updated_at=now,
+        ).returning(*RETURNED_COLUMNS)
+    ).one()
+    apply_calculation_delta(db, user_id, added=[(calc_key, operand_count, now)])
+    return row
+
+
+def _insert_orm(db: Session, user_id, new_calc: Calculation) -> Calculation:
+    """Fallback for dialects without RETURNING: flush, commit, refresh."""
+    db.add(new_calc)
+    db.flush()
+    apply_calculation_delta(
+        db, user_id,
+        added=[(new_calc.type, new_calc.operand_count, new_calc.created_at)],
+    )
+    db.commit()
+    db.refresh(new_calc)
+    return new_calc
+
+
+def build_calculation(calculation_type, user_id, inputs) -> Calculation:
+    """Transient calculation subclass for ``calculation_type`` (400 if unknown)."""
+    try:
+        return Calculation.create(
+            calculation_type=calculation_type,
+            user_id=user_id,
+            inputs=inputs,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def compute(calculation: Calculation) -> float:
+    """Evaluate ``calculation`` (cached, offloaded by cost); 400 on invalid inputs."""
+    try:
+        return compute_result(calculation)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def compute_async(calculation: Calculation) -> float:
+    """``compute`` for the event loop: never blocks it on CPU work or the pool."""
+    try:
+        return await compute_result_async(calculation)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def store_calculation(db: Session, user_id, calculation: Calculation):
+    """
+    Persist an already computed calculation. Where the dialect supports it
+    this is a single INSERT ... RETURNING (plus the stats row) and one
+    commit, returning the inserted row instead of re-selecting an ORM
+    instance. Database work only, so async routes can ``run_sync`` it.
+    """
+    if not _returning(db, "insert"):
+        return _insert_orm(db, user_id, calculation)
+
+    row = _insert_returning(
+        db, user_id,
+        type(calculation).__mapper__.polymorphic_identity,
+        calculation.inputs, calculation.operand_count, calculation.result,
+    )
+    db.commit()
+    return row
+
+
+def create_calculation(db: Session, user_id, calculation_data):
+    """Compute and store one calculation."""
+    calculation = build_calculation(calculation_data.type, user_id, calculation_data.inputs)
+    calculation.result = compute(calculation)
+    return store_calculation(db, user_id, calculation)
+
+
+def create_packed_calculation(db: Session, user_id, calc_key: str, values):
+    """
+    Create a calculation from a float64 operand array (packed request
+    body). The array goes straight to the vectorized evaluator; operands
+    are only converted to Python objects if JSON storage requires it.
+    """
+    try:
+        result = evaluate_vector(calc_key, values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if settings.CALC_INPUTS_STORAGE == "binary":
+        inputs = array("d")
+        inputs.frombytes(values.astype("=f8", copy=False).tobytes())
+    else:
+        inputs = values.tolist()
+
+    if not _returning(db, "insert"):
+        new_calc = Calculation.create(calculation_type=calc_key, user_id=user_id, inputs=inputs)
+        new_calc.result = result
+        return _insert_orm(db, user_id, new_calc)
+
+    row = _insert_returning(db, user_id, calc_key, inputs, len(values), result)
+    db.commit()
+    return row
+
+
+def list_calculations(db: Session, user_id, limit: int, cursor: Optional[str] = None, **filters):
+    """Return ``(rows, next_cursor)`` for one page, newest first, as Core rows."""
+    try:
+        return paginate(db, list_statement(user_id, **filters), cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def get_stats(db: Session, user_id) -> dict:
+    stats = get_user_stats(db, user_id)
+    db.commit()
+    return stats
+
+
+def get_calculation(db: Session, user_id, calc_id: str) -> Calculation:
+    return _owned(db, user_id, calc_id)
+
+
+def check_owned(db: Session, user_id, calc_id: str) -> None:
+    """404 unless ``calc_id`` is one of the user's calculations; reads only the key."""
+    found = db.execute(
+        select(CALCULATIONS.c.id)
+        .where(CALCULATIONS.c.id == _parse_id(calc_id), CALCULATIONS.c.user_id == user_id)
+    ).first()
+    if found is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+
+
+def calculation_type(db: Session, user_id, calc_id: str) -> str:
+    """Type of an owned calculation; 404 if there is none."""
+    calc_type = db.execute(
+        select(CALCULATIONS.c.type)
+        .where(CALCULATIONS.c.id == _parse_id(calc_id), CALCULATIONS.c.user_id == user_id)
+    ).scalar()
+    if calc_type is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+    return calc_type
+
+
+def update_calculation(db: Session, user_id, calc_id: str, calculation_update):
+    """
+    Re-run a calculation with new inputs: a light type lookup (the new
+    result depends on the type), the computation, then ``store_update``.
+    """
+    calculation = None
+    if calculation_update.inputs is not None:
+        calculation = build_calculation(
+            calculation_type(db, user_id, calc_id), user_id, calculation_update.inputs
+        )
+        calculation.result = compute(calculation)
+    return store_update(db, user_id, calc_id, calculation)
+
+
+def store_update(db: Session, user_id, calc_id: str, calculation: Optional[Calculation] = None):
+    """
+    Write an update as one ownership-checked UPDATE ... RETURNING (UPDATE
+    then SELECT on dialects without RETURNING). ``calculation`` holds the
+    new inputs and computed result, or is None when only ``updated_at``
+    changes. Database work only.
+
+    The previous operand count is read with SELECT ... FOR UPDATE in the
+    same transaction, so concurrent updates of one row take turns and each
+    applies its operand delta against the count it actually replaced.
+    """
+    owned = (CALCULATIONS.c.id == _parse_id(calc_id)) & (CALCULATIONS.c.user_id == user_id)
+    values = {"updated_at": datetime.utcnow()}
+    operand_delta = 0
+    if calculation is not None:
+        old_count = db.execute(
+            select(operand_count_sql()).where(owned).with_for_update()
+        ).scalar()
+        if old_count is None:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Calculation not found.")
+        values.update(
+            inputs=calculation.inputs,
+            operand_count=calculation.operand_count,
+            result=calculation.result,
+        )
+        operand_delta = calculation.operand_count - old_count
+
+    statement = update(CALCULATIONS).where(owned).values(**values)
+    if _returning(db, "update"):
+        row = db.execute(statement.returning(*RETURNED_COLUMNS)).first()
+    elif db.execute(statement).rowcount:
+        row = db.execute(select(*RETURNED_COLUMNS).where(owned)).first()
+    else:
+        row = None
+    if row is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+
+    apply_calculation_delta(db, user_id, operand_delta=operand_delta)
+    db.commit()
+    return row
+
+
+def delete_calculation(db: Session, user_id, calc_id: str) -> None:
+    """Ownership-checked DELETE ... RETURNING the facts the stats row needs."""
+    if not _returning(db, "delete"):
+        return _delete_orm(db, user_id, calc_id)
+
+    removed = db.execute(
+        delete(CALCULATIONS)
+        .where(CALCULATIONS.c.id == _parse_id(calc_id), CALCULATIONS.c.user_id == user_id)
+        .returning(
+            CALCULATIONS.c.type,
+            # Legacy rows without operand_count: measure the stored inputs,
+            # as the stats rebuild does, so the stats row stays consistent
+            operand_count_sql(),
+            CALCULATIONS.c.created_at,
+        )
+    ).first()
+    if removed is None:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+
+    apply_calculation_delta(db, user_id, removed=[tuple(removed)])
+    db.commit()
+
+
+def _delete_orm(db: Session, user_id, calc_id: str) -> None:
+    calculation = _owned(db, user_id, calc_id)
+
+    removed = (calculation.type, len(calculation.inputs or []), calculation.created_at)
+    db.delete(calculation)
+    apply_calculation_delta(db, user_id, removed=[removed])
+    db.commit()
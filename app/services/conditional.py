@@ -0,0 +1,107 @@
+# app/services/conditional.py
+
+"""
+Conditional GETs (ETag / Last-Modified) for a user's calculation data.
+
+Every calculation write bumps ``user_calculation_stats.version`` in its own
+transaction, so ``(user, version)`` identifies the state of everything the
+user can read. The ETag hashes that together with the request path and
+query string, since each page, filter and single calculation is its own
+representation; Last-Modified is the stats row's ``updated_at``.
+
+Last-Modified only has one-second resolution, so it is only sent (and
+If-Modified-Since only honored) once ``updated_at`` lies in an earlier
+second than the current one. Otherwise a second write in the same second
+would carry the same date and be answered with a stale 304.
+
+``lookup`` is one primary-key read, done before the route runs its real
+query, so a matching ``If-None-Match`` (or, without one,
+``If-Modified-Since``) is answered with a 304 without touching the
+calculations table or serializing anything.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app.services.user_stats_service import data_version
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime  # naive UTC, like every stored timestamp
+
+    def last_modified_second(self) -> Optional[datetime]:
+        """``last_modified`` truncated to the second, or None while that is the current second."""
+        last_modified = self.last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        if last_modified >= datetime.now(timezone.utc).replace(microsecond=0):
+            return None
+        return last_modified
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        last_modified = self.last_modified_second()
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        return headers
+
+
+def make_validators(request: Request, user_id, version: int, updated_at: datetime) -> Validators:
+    digest = hashlib.blake2b(
+        f"{user_id}:{version}:{request.url.path}?{request.url.query}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return Validators(f'"{digest}"', updated_at)
+
+
+def lookup(db: Session, request: Request, user_id) -> Optional[Validators]:
+    """Validators for ``request``, or None while the user has no stats row yet."""
+    current = data_version(db, user_id)
+    if current is None:
+        return None
+    return make_validators(request, user_id, current.version, current.updated_at)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for If-None-Match."""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """
+    True if the client's copy is current. If-Modified-Since is only
+    consulted when there is no If-None-Match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = validators.last_modified_second()
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def not_modified(request: Request, validators: Optional[Validators]) -> Optional[Response]:
+    """A 304 response if the client's copy is current, else None."""
+    if validators is not None and is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators.headers())
+    return None
+
+
+def set_headers(response: Response, validators: Optional[Validators]) -> None:
+    if validators is not None:
+        response.headers.update(validators.headers())
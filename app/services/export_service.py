@@ -0,0 +1,257 @@
+# app/services/export_service.py
+
+"""
+Streaming export of a user's calculation history.
+
+Rows are pulled from the database ``EXPORT_BATCH_SIZE`` at a time
+(``yield_per`` uses a server-side cursor on Postgres) and each batch is
+encoded and yielded before the next one is fetched, so peak memory is one
+batch regardless of how many rows the user has.
+
+Two encodings are available: CSV (inputs joined with ", ") and NDJSON
+(one JSON object per line, inputs kept as a real array). Either can be
+gzip-compressed incrementally as chunks are produced.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.calculation import Calculation
+from app.services.calculation_query import filter_calculations
+
+
+CSV_HEADER = ["id", "type", "inputs", "result", "created_at"]
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson")
+
+# Preference given to CSV when Accept names neither export format
+CSV_FALLBACK_QUALITY = 0.001
+
+
+class ExportFormat(NamedTuple):
+    """Outcome of content negotiation for an export request."""
+    encoding: str                   # "csv" or "ndjson"
+    gzip_file: bool                 # body is a .gz file (format=csv.gz / ndjson.gz)
+    content_encoding: Optional[str]  # "gzip" when compressed for transport
+
+    @property
+    def media_type(self) -> str:
+        if self.gzip_file:
+            return "application/gzip"
+        return "text/csv" if self.encoding == "csv" else "application/x-ndjson"
+
+    @property
+    def extension(self) -> str:
+        return self.encoding + (".gz" if self.gzip_file else "")
+
+
+def parse_quality(header: Optional[str]) -> Dict[str, float]:
+    """
+    Map each entry of an Accept-style header to its q-value (default 1).
+    Malformed q-values count as 0; a repeated entry keeps its highest q.
+    """
+    qualities: Dict[str, float] = {}
+    for part in (header or "").lower().split(","):
+        name, *params = [piece.strip() for piece in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        qualities[name] = max(q, qualities.get(name, 0.0))
+    return qualities
+
+
+def _quality(qualities: Dict[str, float], names: Iterable[str]) -> Optional[float]:
+    """q of the first of ``names`` the header mentions (most specific first)."""
+    for name in names:
+        if name in qualities:
+            return qualities[name]
+    return None
+
+
+def negotiate_export(
+    format: Optional[str] = None,
+    accept: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> ExportFormat:
+    """
+    Pick the export encoding. An explicit ``format`` (csv, ndjson, csv.gz,
+    ndjson.gz) wins over the ``Accept`` header; without a ``.gz`` format,
+    ``Accept-Encoding: gzip`` compresses the stream for transport.
+
+    ``Accept`` is matched by q-value, with specific types overriding
+    wildcards, and anything at ``q=0`` is refused. CSV remains the fallback
+    when the header names neither format; if both are refused the
+    request fails with 406.
+    """
+    if format:
+        encoding, _, suffix = format.partition(".")
+        if suffix == "gz":
+            return ExportFormat(encoding, True, None)
+    else:
+        qualities = parse_quality(accept)
+        csv_q = _quality(qualities, ("text/csv", "text/*", "*/*"))
+        ndjson_q = _quality(qualities, NDJSON_MEDIA_TYPES + ("application/*", "*/*"))
+        csv_q = CSV_FALLBACK_QUALITY if csv_q is None else csv_q
+        ndjson_q = ndjson_q or 0.0
+        if csv_q <= 0 and ndjson_q <= 0:
+            raise HTTPException(
+                status_code=406,
+                detail="Export is available as text/csv or application/x-ndjson.",
+            )
+        encoding = "ndjson" if ndjson_q > csv_q else "csv"
+
+    codings = parse_quality(accept_encoding)
+    gzip_q = _quality(codings, ("gzip", "*"))
+    return ExportFormat(encoding, False, "gzip" if gzip_q else None)
+
+
+def export_statement(user_id, batch_size: int = None, **filters):
+    """
+    Column-only SELECT for the export, oldest first, fetched ``batch_size``
+    rows at a time. ``filters`` go through ``filter_calculations`` so they
+    run in SQL.
+    """
+    stmt = filter_calculations(
+        select(
+            Calculation.id,
+            Calculation.type,
+            Calculation.inputs,
+            Calculation.result,
+            Calculation.created_at,
+        ),
+        user_id,
+        **filters,
+    )
+    return (
+        stmt.order_by(Calculation.created_at.asc(), Calculation.id.asc())
+        .execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE)
+    )
+
+
+def iter_calculation_batches(
+    db: Session,
+    user_id,
+    batch_size: int = None,
+    **filters,
+) -> Iterator[list]:
+    """Yield lists of export rows, one DB batch at a time."""
+    yield from db.execute(export_statement(user_id, batch_size, **filters)).partitions()
+
+
+def csv_chunk(rows: Iterable = (), header: bool = False) -> str:
+    """Encode one batch of export rows as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    writer.writerows(
+        [
+            str(rec.id),
+            rec.type,
+            ", ".join(str(x) for x in (rec.inputs or [])),
+            rec.result,
+            rec.created_at.isoformat() if rec.created_at else "",
+        ]
+        for rec in rows
+    )
+    return buffer.getvalue()
+
+
+def ndjson_chunk(rows: Iterable) -> str:
+    """Encode one batch of export rows as newline-delimited JSON."""
+    return "".join(
+        json.dumps({
+            "id": str(rec.id),
+            "type": rec.type,
+            "inputs": list(rec.inputs or []),
+            "result": rec.result,
+            "created_at": rec.created_at.isoformat() if rec.created_at else None,
+        }) + "\n"
+        for rec in rows
+    )
+
+
+def stream_csv(db: Session, user_id, batch_size: int = None, **filters) -> Iterator[str]:
+    """
+    Yield the CSV export as text chunks: the header, then one chunk per
+    database batch. The session is closed when the stream ends, since the
+    request's own dependency cleanup has already run by then.
+    """
+    try:
+        yield csv_chunk(header=True)
+        for rows in iter_calculation_batches(db, user_id, batch_size, **filters):
+            yield csv_chunk(rows)
+    finally:
+        db.close()
+
+
+def stream_ndjson(db: Session, user_id, batch_size: int = None, **filters) -> Iterator[str]:
+    """Yield one newline-delimited JSON chunk per database batch."""
+    try:
+        for rows in iter_calculation_batches(db, user_id, batch_size, **filters):
+            yield ndjson_chunk(rows)
+    finally:
+        db.close()
+
+
+def gzip_stream(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip text chunks incrementally, yielding compressed bytes as they fill."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(db: Session, user_id, export_format: ExportFormat, **filters):
+    """Build the body iterator for a negotiated export."""
+    encoder = stream_csv if export_format.encoding == "csv" else stream_ndjson
+    chunks = encoder(db, user_id, **filters)
+    if export_format.gzip_file or export_format.content_encoding == "gzip":
+        return gzip_stream(chunks)
+    return chunks
+
+
+async def astream_export(db, user_id, export_format: ExportFormat, **filters):
+    """
+    Async twin of ``stream_export`` for an ``AsyncSession``: rows arrive via
+    ``AsyncSession.stream`` partitions and are encoded (and optionally
+    gzipped) one batch at a time.
+    """
+    compressor = None
+    if export_format.gzip_file or export_format.content_encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def emit(text: str):
+        return compressor.compress(text.encode("utf-8")) if compressor else text
+
+    try:
+        if export_format.encoding == "csv":
+            yield emit(csv_chunk(header=True))
+
+        result = await db.stream(export_statement(user_id, **filters))
+        async for rows in result.partitions():
+            chunk = emit(csv_chunk(rows) if export_format.encoding == "csv" else ndjson_chunk(rows))
+            if chunk:
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
+    finally:
+        await db.close()
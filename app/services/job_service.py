@@ -0,0 +1,337 @@
+# app/services/job_service.py
+
+"""
+Database-backed background calculation jobs.
+
+``POST /calculations/jobs`` stores the batch as a ``calculation_jobs`` row
+and returns at once. A small pool of worker threads (``CALC_JOB_WORKERS``
+per process) claims queued jobs oldest first and works through them in
+chunks of ``CALC_JOB_CHUNK_SIZE`` using the vectorized batch evaluator.
+Each chunk's inserts, stats update, result rows and progress commit in one
+short transaction, so:
+
+* progress is visible to ``GET /calculations/jobs/{id}`` as it happens,
+* a restarted process resumes a job after its last committed chunk, and
+* workers never hold a transaction open for a whole job, which keeps them
+  from starving interactive CRUD of locks or pooled connections.
+
+The queue is just the table, so it works on SQLite as well as Postgres.
+A job counts as orphaned once its heartbeat is older than
+``CALC_JOB_STALE_SECONDS`` and is put back in the queue. While a job runs,
+a heartbeat thread bumps ``heartbeat_at`` from its own session, so a long
+chunk does not look orphaned. Every write a worker makes to the job row
+is conditional on the ``claim_token`` it claimed the job with: a worker
+whose job was requeued and re-claimed finds its chunk commit matches no
+row, rolls the chunk back and drops the job.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import Counter, register_source
+from app.database import SessionLocal
+from app.models.calculation_job import CalculationJob, CalculationJobResult
+from app.services.batch_service import evaluate_batch, insert_calculations, normalize_type
+from app.services.user_stats_service import apply_calculation_delta
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+def create_job(db: Session, user_id, items) -> CalculationJob:
+    """Persist a queued job for ``items`` (``CalculationBatchItem``s)."""
+    job = CalculationJob(
+        user_id=user_id,
+        status=QUEUED,
+        items=[{"type": item.type, "inputs": list(item.inputs)} for item in items],
+        total=len(items),
+        processed=0,
+        succeeded=0,
+        failed=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_worker.wake()
+    return job
+
+
+def get_job(db: Session, user_id, job_id: str) -> CalculationJob:
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job id format.")
+
+    job = db.query(CalculationJob).filter(
+        CalculationJob.id == job_uuid,
+        CalculationJob.user_id == user_id,
+    ).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+def claim_next_job(db: Session) -> Optional[CalculationJob]:
+    """
+    Atomically move the oldest queued job to ``running`` under a fresh
+    ``claim_token``. The conditional UPDATE makes concurrent claimers
+    (threads or processes) race safely.
+    """
+    while True:
+        job_id = (
+            db.query(CalculationJob.id)
+            .filter(CalculationJob.status == QUEUED)
+            .order_by(CalculationJob.created_at)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        now = datetime.utcnow()
+        claimed = (
+            db.query(CalculationJob)
+            .filter(CalculationJob.id == job_id, CalculationJob.status == QUEUED)
+            .update(
+                {
+                    "status": RUNNING,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                    "claim_token": uuid4().hex,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(CalculationJob, job_id)
+
+
+def _owned(job_id, token: str):
+    """UPDATE of ``job_id`` that only matches while ``token`` still owns it."""
+    return update(CalculationJob).where(
+        CalculationJob.id == job_id,
+        CalculationJob.status == RUNNING,
+        CalculationJob.claim_token == token,
+    )
+
+
+def run_job(db: Session, job: CalculationJob, chunk_size: int) -> bool:
+    """
+    Process ``job`` from its ``processed`` offset, one committed chunk at a
+    time. Returns False, with the current chunk rolled back, if the job was
+    claimed by another worker in the meantime.
+    """
+    job_id, token, user_id = job.id, job.claim_token, job.user_id
+    items, total = job.items, job.total
+    processed, succeeded, failed = job.processed, job.succeeded, job.failed
+
+    while processed < total:
+        start = processed
+        chunk = items[start:start + chunk_size]
+        outcomes = evaluate_batch((item["type"], item["inputs"]) for item in chunk)
+
+        ok = [i for i, (_, error) in enumerate(outcomes) if error is None]
+        records = insert_calculations(
+            db,
+            user_id,
+            (
+                (normalize_type(chunk[i]["type"]), chunk[i]["inputs"], outcomes[i][0])
+                for i in ok
+            ),
+        )
+        if records:
+            apply_calculation_delta(
+                db, user_id,
+                added=[(r["type"], len(r["inputs"]), r["created_at"]) for r in records],
+            )
+
+        results = [
+            {"job_id": job_id, "index": start + i, "id": None, "result": None, "error": error}
+            for i, (_, error) in enumerate(outcomes)
+        ]
+        for i, record in zip(ok, records):
+            results[i].update(id=record["id"], result=record["result"])
+        db.execute(insert(CalculationJobResult), results)
+
+        processed = start + len(chunk)
+        succeeded += len(records)
+        failed += len(chunk) - len(records)
+        progress = db.execute(
+            _owned(job_id, token).values(
+                processed=processed,
+                succeeded=succeeded,
+                failed=failed,
+                heartbeat_at=datetime.utcnow(),
+            )
+        )
+        if not progress.rowcount:
+            db.rollback()
+            return False
+        db.commit()
+
+    finished = db.execute(
+        _owned(job_id, token).values(status=SUCCEEDED, finished_at=datetime.utcnow())
+    )
+    db.commit()
+    return bool(finished.rowcount)
+
+
+def requeue_stale_jobs(db: Session, stale_after: float) -> int:
+    """Put ``running`` jobs whose worker stopped heartbeating back in the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    count = (
+        db.query(CalculationJob)
+        .filter(CalculationJob.status == RUNNING, CalculationJob.heartbeat_at < cutoff)
+        .update({"status": QUEUED, "claim_token": None}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def process_next_job(db: Session, chunk_size: Optional[int] = None) -> bool:
+    """Claim and run one job. Returns False when the queue is empty."""
+    job = claim_next_job(db)
+    if job is None:
+        return False
+
+    job_id, token = job.id, job.claim_token
+    try:
+        with Heartbeat(job_worker.session_factory, job_id, token, job_worker.stale_after / 3):
+            finished = run_job(db, job, chunk_size or settings.CALC_JOB_CHUNK_SIZE)
+        if finished:
+            job_worker.completed.inc()
+        else:
+            logger.warning("Calculation job %s was claimed by another worker", job_id)
+    except Exception as e:
+        logger.exception("Calculation job %s failed", job_id)
+        db.rollback()
+        db.execute(
+            _owned(job_id, token).values(
+                status=FAILED, error=str(e), finished_at=datetime.utcnow()
+            )
+        )
+        db.commit()
+        job_worker.failed.inc()
+    return True
+
+
+class Heartbeat:
+    """
+    Bumps a running job's ``heartbeat_at`` every ``interval`` seconds from
+    its own session, for as long as the ``with`` block runs, so a job stays
+    claimed while a long chunk is being evaluated.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], job_id, token: str, interval: float):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.token = token
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread = threading.Thread(
+            target=self._loop, name=f"calc-job-heartbeat-{self.job_id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                with self.session_factory() as db:
+                    beat = db.execute(
+                        _owned(self.job_id, self.token).values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.commit()
+                if not beat.rowcount:
+                    return
+            except Exception as e:
+                # e.g. SQLite's writer lock held by the chunk; retried next beat
+                logger.warning("Heartbeat for calculation job %s failed: %s", self.job_id, e)
+
+
+class JobWorker:
+    """Fixed pool of daemon threads draining the job table."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int,
+        poll_interval: float,
+        stale_after: float,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+        self.completed = Counter()
+        self.failed = Counter()
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"calc-job-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        """Nudge idle workers after a submit instead of waiting out the poll."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self.session_factory() as db:
+                    requeue_stale_jobs(db, self.stale_after)
+                    while not self._stop.is_set() and process_next_job(db):
+                        pass
+            except Exception:
+                logger.exception("Calculation job worker error")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._threads),
+            "completed": self.completed.value,
+            "failed": self.failed.value,
+        }
+
+
+job_worker = JobWorker(
+    SessionLocal,
+    workers=settings.CALC_JOB_WORKERS,
+    poll_interval=settings.CALC_JOB_POLL_SECONDS,
+    stale_after=settings.CALC_JOB_STALE_SECONDS,
+)
+
+register_source("calc_jobs", job_worker.stats)
@@ -0,0 +1,193 @@
+# app/services/result_cache.py
+
+"""
+Process-local memoization of calculation results.
+
+Clients often resubmit identical ``(type, inputs)`` pairs, and some results
+(exponentiation on large operands) are expensive to recompute. Outcomes are
+cached under the normalized type plus the inputs tuple, with each operand's
+Python type in the key: ``10 ** 400`` and ``10.0 ** 400`` behave differently
+and must not share an entry.
+
+``ValueError`` outcomes are cached too and re-raised with the same message,
+so invalid inputs (division by zero, wrong operand count) fail exactly as
+they do uncached. Any other exception propagates uncached.
+
+The cache is bounded both by entry count and by the total number of
+operands held. Inputs with more operands than that total could never be
+stored, so they bypass the cache before any key is built. When full it evicts among the least recently used entries,
+preferring the one that was cheapest to compute per operand stored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import Counter, register_source
+from app.models.calculation import INPUT_SEQUENCES
+from app.services.calc_executor import calculation_executor
+
+
+# Oldest entries examined per eviction when choosing the cheapest victim
+EVICTION_SAMPLE = 8
+
+
+def result_key(calc_key: str, inputs) -> Optional[Hashable]:
+    """Cache key for ``inputs`` under ``calc_key``, or None if not cacheable."""
+    if not isinstance(inputs, INPUT_SEQUENCES):
+        return None
+    key = (calc_key, tuple((v.__class__, v) for v in inputs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _outcome(value, error):
+    """Return a cached value, or re-raise a cached ``ValueError``."""
+    if error is not None:
+        raise ValueError(error)
+    return value
+
+
+class ResultCache:
+    """Thread-safe, size- and cost-bounded cache of calculation outcomes."""
+
+    def __init__(self, maxsize: int, max_operands: int):
+        self.maxsize = maxsize
+        self.max_operands = max_operands
+        # key -> (value, error message, compute seconds, operand count)
+        self._entries: "OrderedDict[Hashable, Tuple]" = OrderedDict()
+        self._operands = 0
+        self._lock = threading.Lock()
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def get_or_compute(self, calc_key: str, inputs, compute: Callable[[], float]) -> float:
+        """Return the cached outcome for ``(calc_key, inputs)``, else ``compute()`` it."""
+        key = self._key(calc_key, inputs)
+        if key is None:
+            return compute()
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return _outcome(entry[0], entry[1])
+
+        start = time.perf_counter()
+        try:
+            value, error = compute(), None
+        except ValueError as e:
+            value, error = None, str(e)
+        self._store(key, value, error, time.perf_counter() - start, len(inputs))
+        return _outcome(value, error)
+
+    async def aget_or_compute(
+        self, calc_key: str, inputs, compute: Callable[[], Awaitable[float]]
+    ) -> float:
+        """``get_or_compute`` for an async ``compute``, used by the async routes."""
+        key = self._key(calc_key, inputs)
+        if key is None:
+            return await compute()
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return _outcome(entry[0], entry[1])
+
+        start = time.perf_counter()
+        try:
+            value, error = await compute(), None
+        except ValueError as e:
+            value, error = None, str(e)
+        self._store(key, value, error, time.perf_counter() - start, len(inputs))
+        return _outcome(value, error)
+
+    def _key(self, calc_key: str, inputs) -> Optional[Hashable]:
+        """``result_key``, or None without building it when the cache is off or ``inputs`` too large."""
+        if self.maxsize <= 0 or (
+            isinstance(inputs, INPUT_SEQUENCES) and len(inputs) > self.max_operands
+        ):
+            return None
+        return result_key(calc_key, inputs)
+
+    def _lookup(self, key) -> Optional[Tuple]:
+        """The entry for ``key``, counted as a hit, or None (a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return entry
+
+    def _store(self, key, value, error, cost: float, operands: int) -> None:
+        if operands > self.max_operands:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._operands -= old[3]
+            self._entries[key] = (value, error, cost, operands)
+            self._operands += operands
+            while len(self._entries) > self.maxsize or self._operands > self.max_operands:
+                self._evict_one()
+
+    def _evict_one(self) -> None:
+        """Among the oldest entries, drop the lowest compute cost per operand."""
+        sample = []
+        for key in self._entries:
+            sample.append(key)
+            if len(sample) == EVICTION_SAMPLE:
+                break
+        victim = min(sample, key=lambda k: self._entries[k][2] / max(self._entries[k][3], 1))
+        self._operands -= self._entries.pop(victim)[3]
+        self.evictions.inc()
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._operands = 0
+
+    def stats(self) -> dict:
+        hits, misses = self.hits.value, self.misses.value
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "operands": self._operands,
+            "max_operands": self.max_operands,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.evictions.value,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+result_cache = ResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_MAX_OPERANDS)
+
+register_source("result_cache", result_cache.stats)
+
+
+def compute_result(calculation) -> float:
+    """
+    ``calculation.get_result()`` through the shared result cache; misses
+    run on the calculation executor (inline or process pool by cost).
+    """
+    calc_key = type(calculation).__mapper__.polymorphic_identity
+    return result_cache.get_or_compute(
+        calc_key, calculation.inputs, lambda: calculation_executor.run(calculation)
+    )
+
+
+async def compute_result_async(calculation) -> float:
+    """``compute_result`` for the event loop; misses await ``run_async``."""
+    calc_key = type(calculation).__mapper__.polymorphic_identity
+    return await result_cache.aget_or_compute(
+        calc_key, calculation.inputs, lambda: calculation_executor.run_async(calculation)
+    )
@@ -1,16 +1,55 @@
 # app/services/statistics_service.py
 
-from sqlalchemy.orm import Session
-from app.models.calculation import Calculation
-from collections import Counter
+from collections import Counter, defaultdict
 from datetime import datetime
 from uuid import UUID
 
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.calculation import Calculation, operand_count_sql
+
+
+def aggregate_calculations(db: Session, user_id=None) -> dict:
+    """
+    Totals per user straight from the calculations table, in one GROUP BY
+    query (memory depends on users x operation types, not on rows). Type
+    names are normalized, so case and whitespace variants merge.
+
+    Returns {user_id: (type_counts, operand_sum, last_calculation_at)};
+    with ``user_id`` only that user is aggregated. This is the single
+    aggregation behind both ``compute_user_stats`` and the
+    ``user_calculation_stats`` rebuild.
+    """
+    query = db.query(
+        Calculation.user_id,
+        Calculation.type,
+        func.count(Calculation.id),
+        func.coalesce(func.sum(operand_count_sql()), 0),
+        func.max(Calculation.created_at),
+    )
+    if user_id is not None:
+        query = query.filter(Calculation.user_id == user_id)
+
+    totals = defaultdict(lambda: [Counter(), 0, None])
+    for uid, calc_type, count, operand_sum, last in query.group_by(
+        Calculation.user_id, Calculation.type
+    ).all():
+        entry = totals[uid]
+        entry[0][(calc_type or "").strip().lower()] += int(count)
+        entry[1] += int(operand_sum or 0)
+        if last is not None and (entry[2] is None or last > entry[2]):
+            entry[2] = last
+
+    return {uid: (dict(counts), operands, last) for uid, (counts, operands, last) in totals.items()}
+
 
 def compute_user_stats(db: Session, user_id):
     """
     Compute statistics for all calculations belonging to a given user.
     Works with both UUID objects and UUID strings.
+
+    Counts, operand totals and the latest timestamp come from
+    ``aggregate_calculations``.
     """
 
     # --- FIX 1: Normalize user_id to UUID for SQLAlchemy (SQLite+Postgres safe) ---
@@ -27,15 +66,11 @@ def compute_user_stats(db: Session, user_id):
                 "last_calculation_date": None,
             }
 
-    # --- Query calculations ---
-    records = (
-        db.query(Calculation)
-        .filter(Calculation.user_id == user_id)
-        .all()
-    )
+    # --- Aggregate per type in the database (O(groups) rows) ---
+    aggregates = aggregate_calculations(db, user_id)
 
     # If no calculations exist
-    if not records:
+    if not aggregates:
         return {
             "total_calculations": 0,
             "average_operands": 0.0,
@@ -44,22 +79,16 @@ def compute_user_stats(db: Session, user_id):
             "last_calculation_date": None,
         }
 
-    total = len(records)
-
-    # --- Operation type breakdown ---
-    types = [(r.type or "").strip().lower() for r in records]
-    breakdown = {k: int(v) for k, v in Counter(types).items()}
+    # --- Operation type breakdown (only this user was aggregated) ---
+    [(breakdown, operand_total, last_dt)] = aggregates.values()
+    total = sum(breakdown.values())
 
     # --- Average operand count ---
-    operand_counts = [len(r.inputs) if r.inputs else 0 for r in records]
-    avg_operands = float(sum(operand_counts) / total)
+    avg_operands = float(operand_total / total)
 
     # --- Most used operation ---
     most_used = max(breakdown, key=breakdown.get) if breakdown else None
 
-    # --- Last calculation timestamp (converted to ISO8601) ---
-    last_dt = max(records, key=lambda r: r.created_at).created_at
-
     # Convert timestamp to ISO string
     try:    
         if isinstance(last_dt, datetime):
@@ -0,0 +1,238 @@
+# app/services/user_stats_service.py
+
+"""
+Incrementally maintained per-user calculation statistics.
+
+Every calculation write calls ``apply_calculation_delta`` inside its own
+transaction, so ``user_calculation_stats`` always agrees with the
+``calculations`` table once the write commits. ``rebuild_user_stats``
+recomputes rows from scratch for backfill and drift repair:
+
+    python -m app.services.user_stats_service [--user-id UUID]
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.calculation import Calculation
+from app.models.user_stats import UserCalculationStats
+from app.services.statistics_service import aggregate_calculations
+
+
+# (type, operand_count, created_at) for one added or removed calculation
+CalculationFacts = Tuple[str, int, datetime]
+
+
+def _normalize(calc_type) -> str:
+    return (calc_type or "").strip().lower()
+
+
+def _assign(row: UserCalculationStats, type_counts: dict, operand_sum: int, last) -> None:
+    row.type_counts = type_counts
+    row.total_count = sum(type_counts.values())
+    row.operand_sum = operand_sum
+    row.last_calculation_at = last
+    row.version = (row.version or 0) + 1
+    row.updated_at = datetime.utcnow()
+
+
+def _ensure_row(db: Session, user_id) -> None:
+    """
+    Create an empty stats row for ``user_id`` unless one exists. Uses
+    ``INSERT ... ON CONFLICT DO NOTHING`` where available, so two first
+    writes for the same user can both get here without a duplicate-key
+    error; the loser waits for the winner's row and then locks it.
+    """
+    values = dict(
+        user_id=user_id,
+        total_count=0,
+        type_counts={},
+        operand_sum=0,
+        version=0,
+        updated_at=datetime.utcnow(),
+    )
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        db.execute(
+            upsert(UserCalculationStats)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        return
+
+    try:  # pragma: no cover  (other dialects)
+        with db.begin_nested():
+            db.execute(insert(UserCalculationStats).values(**values))
+    except IntegrityError:  # pragma: no cover
+        pass
+
+
+def rebuild_user_stats(db: Session, user_id=None) -> int:
+    """
+    Recompute stats rows from the calculations table.
+
+    With ``user_id`` only that user's row is rebuilt; otherwise every
+    existing row is refreshed and rows are created for any user who has
+    calculations. Returns the number of rows written. The caller commits.
+
+    Rows are created and locked before aggregating, so a concurrent
+    writer's delta is never lost between the aggregate and the write.
+    """
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [uid for (uid,) in db.query(Calculation.user_id).distinct()]
+    for uid in user_ids:
+        _ensure_row(db, uid)
+
+    existing = db.query(UserCalculationStats).with_for_update().populate_existing()
+    if user_id is not None:
+        existing = existing.filter(UserCalculationStats.user_id == user_id)
+    rows = existing.all()
+
+    aggregates = aggregate_calculations(db, user_id)
+    for row in rows:
+        _assign(row, *aggregates.get(row.user_id, ({}, 0, None)))
+
+    db.flush()
+    return len(rows)
+
+
+def _locked_row(db: Session, user_id) -> Optional[UserCalculationStats]:
+    return (
+        db.query(UserCalculationStats)
+        .filter(UserCalculationStats.user_id == user_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+
+
+def apply_calculation_delta(
+    db: Session,
+    user_id,
+    added: Iterable[CalculationFacts] = (),
+    removed: Iterable[CalculationFacts] = (),
+    operand_delta: int = 0,
+) -> None:
+    """
+    Fold added/removed calculations into the user's stats row.
+    ``operand_delta`` covers in-place edits that only change how many
+    operands an existing calculation has.
+
+    Must be called after the calculation write itself is part of the
+    session's transaction: pending changes are flushed first, and a user
+    without a row yet gets one rebuilt from the (already updated) table
+    (created with an upsert, so concurrent first writes don't collide).
+    """
+    db.flush()
+
+    row = _locked_row(db, user_id)
+    if row is None:
+        rebuild_user_stats(db, user_id)
+        return
+
+    type_counts = dict(row.type_counts or {})
+    operand_sum = (row.operand_sum or 0) + operand_delta
+    last = row.last_calculation_at
+    last_removed = False
+
+    for calc_type, operand_count, created_at in added:
+        key = _normalize(calc_type)
+        type_counts[key] = type_counts.get(key, 0) + 1
+        operand_sum += operand_count
+        if created_at is not None and (last is None or created_at > last):
+            last = created_at
+
+    for calc_type, operand_count, created_at in removed:
+        key = _normalize(calc_type)
+        remaining = type_counts.get(key, 0) - 1
+        if remaining > 0:
+            type_counts[key] = remaining
+        else:
+            type_counts.pop(key, None)
+        operand_sum -= operand_count
+        if last is not None and created_at is not None and created_at >= last:
+            last_removed = True
+
+    if last_removed:
+        last = (
+            db.query(func.max(Calculation.created_at))
+            .filter(Calculation.user_id == user_id)
+            .scalar()
+        )
+
+    _assign(row, type_counts, max(operand_sum, 0), last)
+
+
+def data_version(db: Session, user_id) -> Optional[Tuple[int, datetime]]:
+    """
+    ``(version, updated_at)`` of the user's stats row, or None before the
+    row exists. Changes with every write to the user's calculations.
+    """
+    return db.execute(
+        select(UserCalculationStats.version, UserCalculationStats.updated_at)
+        .where(UserCalculationStats.user_id == user_id)
+    ).first()
+
+
+def get_user_stats(db: Session, user_id) -> dict:
+    """
+    Return the ``CalculationStats`` payload for a user from the stats row.
+    A missing row is backfilled from the calculations table; the caller
+    commits so the backfill is kept.
+    """
+    if isinstance(user_id, str):
+        user_id = UUID(user_id)
+
+    row = db.get(UserCalculationStats, user_id)
+    if row is None:
+        rebuild_user_stats(db, user_id)
+        row = db.get(UserCalculationStats, user_id)
+
+    total = row.total_count or 0
+    if total == 0:
+        return {
+            "total_calculations": 0,
+            "average_operands": 0.0,
+            "operations_breakdown": {},
+            "most_used_operation": None,
+            "last_calculation_date": None,
+        }
+
+    breakdown = {k: int(v) for k, v in (row.type_counts or {}).items() if v}
+    return {
+        "total_calculations": total,
+        "average_operands": float(row.operand_sum / total),
+        "operations_breakdown": breakdown,
+        "most_used_operation": max(breakdown, key=breakdown.get) if breakdown else None,
+        "last_calculation_date": (
+            row.last_calculation_at.isoformat() if row.last_calculation_at else None
+        ),
+    }
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+    import app.models  # noqa: F401  (register all mappers)
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild user_calculation_stats from calculations.")
+    parser.add_argument("--user-id", type=UUID, default=None, help="Rebuild a single user")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        written = rebuild_user_stats(session, args.user_id)
+        session.commit()
+        print(f"Rebuilt {written} user stats row(s).")
+    finally:
+        session.close()
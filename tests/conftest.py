@@ -281,6 +281,21 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def auth_headers(db_session: Session, client: TestClient) -> Dict[str, str]:
+    """Register a fresh user, log in, and return its Authorization header."""
+    user_data = create_fake_user()
+    User.register(db_session, user_data)
+    db_session.commit()
+
+    response = client.post(
+        "/auth/login",
+        json={"username": user_data["username"], "password": user_data["password"]},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
 # ======================================================================================
 # Pytest Command-Line Options
 # ======================================================================================
@@ -0,0 +1,127 @@
+# tests/integration/test_api_batch.py
+
+import uuid
+
+from app.models.calculation import Calculation
+
+
+def test_batch_create_and_persist(client, auth_headers):
+    payload = {"items": [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "Division", "inputs": [10, 0]},
+        {"type": "multiplication", "inputs": [2, 3, 4]},
+        {"type": "unknown", "inputs": [1, 2]},
+    ]}
+
+    resp = client.post("/calculations/batch", json=payload, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+
+    data = resp.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 2
+
+    items = data["items"]
+    assert items[0]["result"] == 3
+    assert items[1]["error"] == "Cannot divide by zero."
+    assert items[2]["result"] == 24
+    assert items[3]["error"] == "Unsupported calculation type"
+
+    # persisted rows are readable through the single-item route
+    get_resp = client.get(f"/calculations/{items[2]['id']}", headers=auth_headers)
+    assert get_resp.status_code == 200
+    assert get_resp.json()["type"] == "multiplication"
+
+
+def test_batch_rejects_empty(client, auth_headers):
+    resp = client.post("/calculations/batch", json={"items": []}, headers=auth_headers)
+    assert resp.status_code == 422
+
+
+def test_bulk_create_returns_ids_and_timestamps(client, auth_headers, db_session):
+    payload = {"items": [{"type": "addition", "inputs": [i, 1]} for i in range(2500)]}
+
+    resp = client.post("/calculations/bulk", json=payload, headers=auth_headers)
+    assert resp.status_code == 201, resp.text
+
+    data = resp.json()
+    assert data["created"] == 2500
+    assert data["items"][10]["result"] == 11
+    assert data["items"][10]["created_at"]
+
+    stored = db_session.get(Calculation, uuid.UUID(data["items"][10]["id"]))
+    assert stored.result == 11
+    assert stored.inputs == [10, 1]
+
+
+def test_bulk_create_is_all_or_nothing(client, auth_headers):
+    payload = {"items": [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "subtraction", "inputs": [1]},
+    ]}
+
+    resp = client.post("/calculations/bulk", json=payload, headers=auth_headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Item 1: Inputs must be a list with at least two numbers."
+
+    assert client.get("/calculations", headers=auth_headers).json() == []
+
+
+# ---------------------------------------------------------
+# Packed float64 bodies
+# ---------------------------------------------------------
+
+def test_packed_calculation_created_from_raw_float64(client, auth_headers):
+    import numpy as np
+
+    values = np.arange(1, 100001, dtype="<f8")
+    resp = client.post(
+        "/calculations/packed?type=addition",
+        content=values.tobytes(),
+        headers={**auth_headers, "Content-Type": "application/octet-stream"},
+    )
+
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+    assert data["operand_count"] == 100000
+    assert data["result"] == sum(values.tolist())
+    assert "inputs" not in data
+
+
+def test_packed_calculation_accepts_base64(client, auth_headers):
+    import base64
+    import numpy as np
+
+    body = base64.b64encode(np.array([2.0, 10.0], dtype="<f8").tobytes())
+    resp = client.post("/calculations/packed?type=power&encoding=base64", content=body, headers=auth_headers)
+
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["result"] == 1024.0
+
+
+def test_packed_calculation_reports_subclass_errors(client, auth_headers):
+    import numpy as np
+
+    body = np.array([1.0, 2.0, 0.0], dtype="<f8").tobytes()
+    resp = client.post("/calculations/packed?type=division", content=body, headers=auth_headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Cannot divide by zero."
+
+    resp = client.post("/calculations/packed?type=addition", content=b"\x00" * 7, headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_packed_calculation_rejects_oversized_bodies(client, auth_headers, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CALC_PACKED_MAX_OPERANDS", 2)
+    body = b"\x00" * 24
+
+    resp = client.post("/calculations/packed?type=addition", content=body, headers=auth_headers)
+    assert resp.status_code == 413
+
+    # Chunked upload without Content-Length: cut off while streaming
+    resp = client.post(
+        "/calculations/packed?type=addition",
+        content=iter([body[:8], body[8:16], body[16:]]),
+        headers=auth_headers,
+    )
+    assert resp.status_code == 413
@@ -94,3 +94,18 @@ def test_modulus_requires_two_numbers(client, fake_user_data):
     data = resp.json()
     # Error message comes from the ValueError in Modulus.get_result()
     assert "Modulus operation requires exactly two numbers" in data.get("detail", "")
+
+
+def test_exponentiation_chain_over_budget_returns_400(client, fake_user_data):
+    """
+    A power tower like [10, 10, 10, 10] is rejected up front instead of
+    computing a 10**1000-sized intermediate.
+    """
+    token = register_and_login(client, fake_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    payload = {"type": "exponentiation", "inputs": [10, 10, 10, 10]}
+    resp = client.post("/calculations", json=payload, headers=headers)
+
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Result is too large."
@@ -0,0 +1,89 @@
+# tests/integration/test_async_routes.py
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.async_routes import router
+from app.auth.dependencies import get_current_active_user_async
+from app.core.config import settings
+from app.database import (
+    get_async_db,
+    get_async_database_url,
+    get_async_engine,
+    get_async_sessionmaker,
+)
+
+
+def test_async_database_url_swaps_driver():
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert get_async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert get_async_database_url("postgresql+asyncpg://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+@pytest.fixture
+def async_client(test_user):
+    """App serving only the async router, on an async engine over the test DB."""
+    if not settings.DATABASE_URL.startswith(("sqlite", "postgresql")):
+        pytest.skip("no async driver mapping for this database")
+
+    async_engine = get_async_engine(settings.DATABASE_URL)
+    session_factory = get_async_sessionmaker(async_engine)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_active_user_async] = lambda: test_user
+
+    with TestClient(app) as c:
+        yield c
+
+    asyncio.run(async_engine.dispose())
+
+
+def test_async_crud_round_trip(async_client):
+    created = async_client.post("/calculations", json={"type": "addition", "inputs": [2, 3]})
+    assert created.status_code == 201, created.text
+    calc_id = created.json()["id"]
+    assert created.json()["result"] == 5
+
+    fetched = async_client.get(f"/calculations/{calc_id}")
+    assert fetched.status_code == 200
+    assert fetched.json()["type"] == "addition"
+
+    updated = async_client.put(f"/calculations/{calc_id}", json={"inputs": [4, 4, 4]})
+    assert updated.json()["result"] == 12
+
+    listed = async_client.get("/calculations", params={"limit": 10})
+    assert [c["id"] for c in listed.json()] == [calc_id]
+
+    stats = async_client.get("/calculations/stats").json()
+    assert stats["total_calculations"] == 1
+    assert stats["average_operands"] == 3.0
+
+    assert async_client.delete(f"/calculations/{calc_id}").status_code == 204
+    assert async_client.get(f"/calculations/{calc_id}").status_code == 404
+
+
+def test_async_errors_match_sync_routes(async_client):
+    assert async_client.get("/calculations/not-a-uuid").json()["detail"] == "Invalid calculation id format."
+    resp = async_client.post("/calculations", json={"type": "addition", "inputs": [1]})
+    assert resp.status_code == 400
+
+
+def test_async_export_streams(async_client):
+    async_client.post("/calculations", json={"type": "multiplication", "inputs": [2, 5]})
+
+    resp = async_client.get("/calculations/export", params={"format": "ndjson"})
+    assert resp.status_code == 200
+    assert '"inputs": [2.0, 5.0]' in resp.text
+
+    resp = async_client.get("/calculations/report.csv", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text.splitlines()[0] == "id,type,inputs,result,created_at"
@@ -130,3 +130,134 @@ def test_login_invalid_credentials(client):
 
     assert resp.status_code == 401
     assert "Invalid username or password" in resp.json()["detail"]
+
+
+def test_login_returns_503_when_hash_pool_is_saturated(client, monkeypatch):
+    from app.auth import hashing
+
+    username = f"busy_{uuid.uuid4().hex[:6]}"
+    payload = {
+        "first_name": "Busy",
+        "last_name": "Pool",
+        "email": f"{username}@example.com",
+        "username": username,
+        "password": valid_password(),
+        "confirm_password": valid_password(),
+    }
+    assert client.post("/auth/register", json=payload).status_code == 201
+
+    async def saturated(fn, *args):
+        raise hashing.HTTPException(
+            status_code=503, detail="Server busy, please retry.", headers={"Retry-After": "1"}
+        )
+
+    monkeypatch.setattr(hashing.password_executor, "run_async", saturated)
+    resp = client.post("/auth/login", json={"username": username, "password": valid_password()})
+
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+# ---------------------------------------------------------
+# Logout / revocation
+# ---------------------------------------------------------
+
+def _register_and_login(client):
+    username = f"logout_{uuid.uuid4().hex[:6]}"
+    client.post("/auth/register", json={
+        "first_name": "Log",
+        "last_name": "Out",
+        "email": f"{username}@example.com",
+        "username": username,
+        "password": valid_password(),
+        "confirm_password": valid_password(),
+    })
+    return client.post("/auth/login", json={"username": username, "password": valid_password()}).json()
+
+
+def test_logout_revokes_access_token(client):
+    tokens = _register_and_login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/calculations", headers=headers).status_code == 200
+
+    resp = client.post("/auth/logout", headers=headers, json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 204
+
+    resp = client.get("/calculations", headers=headers)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Token has been revoked"
+
+
+def test_logout_rejects_refresh_token_of_other_user(client):
+    first, second = _register_and_login(client), _register_and_login(client)
+
+    resp = client.post(
+        "/auth/logout",
+        headers={"Authorization": f"Bearer {first['access_token']}"},
+        json={"refresh_token": second["refresh_token"]},
+    )
+    assert resp.status_code == 400
+
+
+# ---------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------
+
+def test_refresh_issues_new_access_token(client):
+    tokens = _register_and_login(client)
+
+    resp = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["refresh_token"] == tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert client.get("/calculations", headers=headers).status_code == 200
+
+
+def test_refresh_rejects_access_token(client):
+    tokens = _register_and_login(client)
+
+    resp = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+
+    assert resp.status_code == 401
+
+
+def test_refresh_with_rotation_revokes_old_refresh_token(client, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_ROTATION", True)
+    tokens = _register_and_login(client)
+
+    resp = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 200
+    rotated = resp.json()["refresh_token"]
+    assert rotated != tokens["refresh_token"]
+
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": rotated}).status_code == 200
+
+
+def test_refresh_with_non_uuid_subject_is_401(client):
+    from app.auth.jwt import create_token
+    from app.schemas.token import TokenType
+
+    token = create_token("not-a-uuid", TokenType.REFRESH)
+
+    resp = client.post("/auth/refresh", json={"refresh_token": token})
+
+    assert resp.status_code == 401
+
+
+def test_refresh_rotation_rejects_token_revoked_concurrently(client, monkeypatch):
+    from app import main
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_ROTATION", True)
+    tokens = _register_and_login(client)
+
+    async def already_revoked(jti, expires_at=None):
+        return False
+
+    monkeypatch.setattr(main, "add_to_blacklist", already_revoked)
+    resp = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert resp.status_code == 401
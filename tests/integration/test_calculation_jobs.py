@@ -0,0 +1,149 @@
+# tests/integration/test_calculation_jobs.py
+
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.models.calculation import Calculation
+from app.models.calculation_job import CalculationJob, CalculationJobResult
+from app.services import job_service
+
+
+def _wait_for_job(client, headers, url, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        data = client.get(url, headers=headers).json()
+        if data["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return data
+        time.sleep(0.05)
+
+
+def test_job_is_accepted_then_completed(client, auth_headers, db_session):
+    payload = {"items": [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "division", "inputs": [10, 0]},
+        {"type": "multiplication", "inputs": [2, 3, 4]},
+    ]}
+
+    resp = client.post("/calculations/jobs", json=payload, headers=auth_headers)
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["total"] == 3
+    assert resp.headers["location"] == f"/calculations/jobs/{job['id']}"
+
+    # Run it here unless the background worker already claimed it
+    job_service.process_next_job(db_session, chunk_size=2)
+    data = _wait_for_job(client, auth_headers, resp.headers["location"])
+
+    assert data["status"] == "succeeded"
+    assert (data["processed"], data["succeeded"], data["failed"]) == (3, 2, 1)
+    assert [item["index"] for item in data["items"]] == [0, 1, 2]
+    assert data["items"][0]["result"] == 3
+    assert data["items"][1]["error"] == "Cannot divide by zero."
+
+    stored = db_session.get(Calculation, uuid.UUID(data["items"][2]["id"]))
+    assert stored.result == 24
+
+
+def test_job_of_another_user_is_not_found(client, auth_headers):
+    resp = client.get(f"/calculations/jobs/{uuid.uuid4()}", headers=auth_headers)
+    assert resp.status_code == 404
+
+    resp = client.get("/calculations/jobs/not-a-uuid", headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_stale_running_job_is_requeued_and_resumed(db_session, test_user):
+    job = CalculationJob(
+        user_id=test_user.id,
+        status="running",
+        items=[{"type": "addition", "inputs": [1, 1]}, {"type": "addition", "inputs": [2, 2]}],
+        results=[CalculationJobResult(index=0, id=uuid.uuid4(), result=2)],
+        total=2,
+        processed=1,
+        succeeded=1,
+        failed=0,
+        heartbeat_at=datetime.utcnow() - timedelta(hours=1),
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    assert job_service.requeue_stale_jobs(db_session, stale_after=60) >= 1
+    while job_service.process_next_job(db_session):
+        pass
+
+    db_session.refresh(job)
+    assert job.status == "succeeded"
+    assert job.succeeded == 2
+    assert [r.index for r in job.results] == [0, 1]
+    assert job.results[1].result == 4
+
+
+def _queued_job(db_session, user, items):
+    job = CalculationJob(
+        user_id=user.id, status="queued", items=items, total=len(items),
+        processed=0, succeeded=0, failed=0,
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def test_worker_that_lost_its_claim_does_not_commit(db_session, test_user, monkeypatch):
+    from sqlalchemy.orm import Session
+
+    _queued_job(db_session, test_user, [{"type": "addition", "inputs": [1, 1]}])
+    job = job_service.claim_next_job(db_session)
+    before = db_session.query(Calculation).filter(Calculation.user_id == test_user.id).count()
+    evaluate = job_service.evaluate_batch
+
+    def evaluate_then_lose_claim(pairs):
+        # Requeued as stale and claimed by another worker mid-chunk
+        with Session(bind=db_session.get_bind()) as other:
+            other.query(CalculationJob).filter(CalculationJob.id == job.id).update(
+                {"claim_token": uuid.uuid4().hex}, synchronize_session=False
+            )
+            other.commit()
+        return evaluate(pairs)
+
+    monkeypatch.setattr(job_service, "evaluate_batch", evaluate_then_lose_claim)
+
+    assert job_service.run_job(db_session, job, chunk_size=10) is False
+    assert db_session.query(Calculation).filter(Calculation.user_id == test_user.id).count() == before
+    assert db_session.query(CalculationJobResult).filter_by(job_id=job.id).count() == 0
+
+
+def test_timed_out_item_fails_alone(db_session, test_user, monkeypatch):
+    from fastapi import HTTPException
+
+    from app.services import batch_service
+
+    def time_out(calculation):
+        raise HTTPException(status_code=504, detail="Calculation timed out.")
+
+    # Only the zero-divisor item falls back to the executor
+    monkeypatch.setattr(batch_service, "compute_result", time_out)
+    _queued_job(db_session, test_user, [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "division", "inputs": [1, 0]},
+    ])
+    job = job_service.claim_next_job(db_session)
+
+    assert job_service.run_job(db_session, job, chunk_size=10) is True
+    db_session.refresh(job)
+    assert job.status == "succeeded"
+    assert (job.succeeded, job.failed) == (1, 1)
+    assert [(r.result, r.error) for r in job.results] == [(3.0, None), (None, "Calculation timed out.")]
+
+
+def test_failure_of_a_deleted_job_is_ignored(db_session, test_user, monkeypatch):
+    _queued_job(db_session, test_user, [{"type": "addition", "inputs": [1, 1]}])
+
+    def fail(db, job, chunk_size):
+        db.query(CalculationJob).filter(CalculationJob.id == job.id).delete(synchronize_session=False)
+        db.commit()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(job_service, "run_job", fail)
+
+    assert job_service.process_next_job(db_session) is True
@@ -1,9 +1,15 @@
 # tests/integration/test_calculation_routes.py
 
 import uuid
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
 import pytest
 from fastapi import status
+from sqlalchemy import update
+
 from app.models.user import User
+from app.models.user_stats import UserCalculationStats
 
 
 @pytest.fixture
@@ -198,3 +204,230 @@ def test_export_calculations_csv(client, auth_headers):
     assert "addition" in resp.text
     assert "4.0, 6.0" in resp.text
 
+
+
+def test_stats_follow_update_and_delete(client, auth_headers):
+    first = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]},
+                        headers=auth_headers).json()
+    client.post("/calculations", json={"type": "multiplication", "inputs": [2, 3]},
+                headers=auth_headers)
+
+    client.put(f"/calculations/{first['id']}", json={"inputs": [1, 2, 3, 4]}, headers=auth_headers)
+    data = client.get("/calculations/stats", headers=auth_headers).json()
+    assert data["total_calculations"] == 2
+    assert data["average_operands"] == 3.0
+
+    client.delete(f"/calculations/{first['id']}", headers=auth_headers)
+    data = client.get("/calculations/stats", headers=auth_headers).json()
+    assert data["total_calculations"] == 1
+    assert data["operations_breakdown"] == {"multiplication": 1}
+    assert data["average_operands"] == 2.0
+
+
+def test_update_of_legacy_row_measures_the_replaced_inputs(client, auth_headers, db_session):
+    from app.models.calculation import Calculation
+
+    calc_id = client.post("/calculations", json={"type": "addition", "inputs": [1, 2, 3]},
+                          headers=auth_headers).json()["id"]
+    # Written before operand_count existed
+    db_session.execute(
+        update(Calculation.__table__)
+        .where(Calculation.__table__.c.id == uuid.UUID(calc_id))
+        .values(operand_count=None)
+    )
+    db_session.commit()
+
+    client.put(f"/calculations/{calc_id}", json={"inputs": [1, 2]}, headers=auth_headers)
+    data = client.get("/calculations/stats", headers=auth_headers).json()
+    assert data["average_operands"] == 2.0
+
+
+# ------------------------------------------------------------
+# LIST pagination + filters
+# ------------------------------------------------------------
+def test_list_calculations_keyset_pages(client, auth_headers):
+    items = [{"type": "addition", "inputs": [i, 0]} for i in range(5)]
+    client.post("/calculations/bulk", json={"items": items}, headers=auth_headers)
+    client.post("/calculations", json={"type": "multiplication", "inputs": [2, 3]},
+                headers=auth_headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/calculations", params=params, headers=auth_headers)
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page) <= 2
+        seen.extend(c["id"] for c in page)
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            assert "Link" not in resp.headers
+            break
+        assert resp.headers["Link"].endswith('>; rel="next"')
+        assert f"cursor={cursor}" in resp.headers["Link"]
+
+    assert len(seen) == 6
+    assert len(set(seen)) == 6
+
+    # newest first: the single create happened after the bulk insert
+    first = client.get("/calculations", params={"limit": 1}, headers=auth_headers).json()
+    assert first[0]["type"] == "multiplication"
+
+
+def test_list_calculations_filters(client, auth_headers):
+    client.post("/calculations/bulk", json={"items": [
+        {"type": "addition", "inputs": [1, 1]},
+        {"type": "addition", "inputs": [10, 10]},
+        {"type": "subtraction", "inputs": [10, 1]},
+    ]}, headers=auth_headers)
+
+    resp = client.get("/calculations", params={"type": "addition"}, headers=auth_headers)
+    assert sorted(c["result"] for c in resp.json()) == [2, 20]
+
+    resp = client.get("/calculations", params={"min_result": 5, "max_result": 10},
+                      headers=auth_headers)
+    assert [c["result"] for c in resp.json()] == [9]
+
+    resp = client.get("/calculations", params={"created_after": "2999-01-01T00:00:00"},
+                      headers=auth_headers)
+    assert resp.json() == []
+
+
+def test_list_calculations_invalid_cursor(client, auth_headers):
+    resp = client.get("/calculations", params={"cursor": "garbage"}, headers=auth_headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid cursor."
+
+
+# ------------------------------------------------------------
+# Ownership is enforced in the write statement itself
+# ------------------------------------------------------------
+def test_update_and_delete_of_another_users_calculation(client, auth_headers, db_session):
+    calc_id = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]},
+                          headers=auth_headers).json()["id"]
+
+    other = User.register(db_session, {
+        "first_name": "Other",
+        "last_name": "User",
+        "email": f"other_{uuid.uuid4().hex}@example.com",
+        "username": f"other_{uuid.uuid4().hex}",
+        "password": "StrongPass123",
+    })
+    db_session.commit()
+    token = client.post("/auth/login", json={"username": other.username,
+                                             "password": "StrongPass123"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.put(f"/calculations/{calc_id}", json={"inputs": [5, 5]},
+                      headers=other_headers).status_code == 404
+    assert client.delete(f"/calculations/{calc_id}", headers=other_headers).status_code == 404
+
+    resp = client.get(f"/calculations/{calc_id}", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["result"] == 3
+
+
+def test_update_calculation_invalid_inputs(client, auth_headers):
+    calc_id = client.post("/calculations", json={"type": "division", "inputs": [8, 2]},
+                          headers=auth_headers).json()["id"]
+
+    resp = client.put(f"/calculations/{calc_id}", json={"inputs": [8, 0]}, headers=auth_headers)
+    assert resp.status_code == 400
+
+    resp = client.get(f"/calculations/{calc_id}", headers=auth_headers)
+    assert resp.json()["result"] == 4
+
+
+# ------------------------------------------------------------
+# Conditional GETs (ETag / Last-Modified)
+# ------------------------------------------------------------
+def test_conditional_get_returns_304_until_data_changes(client, auth_headers):
+    calc_id = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]},
+                          headers=auth_headers).json()["id"]
+
+    for path in ("/calculations", "/calculations/stats", f"/calculations/{calc_id}"):
+        first = client.get(path, headers=auth_headers)
+        etag = first.headers["ETag"]
+
+        again = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+
+    etag = client.get("/calculations", headers=auth_headers).headers["ETag"]
+    client.put(f"/calculations/{calc_id}", json={"inputs": [2, 2]}, headers=auth_headers)
+
+    resp = client.get("/calculations", headers={**auth_headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()[0]["result"] == 4
+    assert resp.headers["ETag"] != etag
+
+
+def test_if_modified_since_ignores_same_second_writes(client, auth_headers, db_session):
+    created = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]},
+                          headers=auth_headers).json()
+    now = formatdate(usegmt=True)
+
+    # Written this second: a later write could share the date, so no Last-Modified yet
+    first = client.get("/calculations", headers=auth_headers)
+    assert "Last-Modified" not in first.headers
+    resp = client.get("/calculations", headers={**auth_headers, "If-Modified-Since": now})
+    assert resp.status_code == 200
+
+    db_session.execute(
+        update(UserCalculationStats)
+        .where(UserCalculationStats.user_id == uuid.UUID(created["user_id"]))
+        .values(updated_at=datetime.utcnow() - timedelta(seconds=5))
+    )
+    db_session.commit()
+
+    first = client.get("/calculations", headers=auth_headers)
+    since = client.get("/calculations", headers={**auth_headers,
+                                                  "If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+
+def test_if_none_match_star_checks_the_calculation(client, auth_headers, db_session, monkeypatch):
+    from app.services import calculation_service
+
+    calc_id = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]},
+                          headers=auth_headers).json()["id"]
+    star = {**auth_headers, "If-None-Match": "*"}
+
+    def no_row_query(*args):
+        raise AssertionError("row loaded for a 304")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(calculation_service, "get_calculation", no_row_query)
+        assert client.get(f"/calculations/{calc_id}", headers=star).status_code == 304
+    assert client.get(f"/calculations/{uuid.uuid4()}", headers=star).status_code == 404
+
+    other = User.register(db_session, {
+        "first_name": "Other",
+        "last_name": "User",
+        "email": f"other_{uuid.uuid4().hex}@example.com",
+        "username": f"other_{uuid.uuid4().hex}",
+        "password": "StrongPass123",
+    })
+    db_session.commit()
+    token = client.post("/auth/login", json={"username": other.username,
+                                             "password": "StrongPass123"}).json()["access_token"]
+    client.post("/calculations", json={"type": "addition", "inputs": [3, 4]},
+                headers={"Authorization": f"Bearer {token}"})
+    resp = client.get(f"/calculations/{calc_id}",
+                      headers={"Authorization": f"Bearer {token}", "If-None-Match": "*"})
+    assert resp.status_code == 404
+
+
+def test_etag_differs_per_query(client, auth_headers):
+    client.post("/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=auth_headers)
+
+    full = client.get("/calculations", headers=auth_headers).headers["ETag"]
+    page = client.get("/calculations", params={"limit": 1}, headers=auth_headers).headers["ETag"]
+    assert full != page
+
+    resp = client.get("/calculations", params={"limit": 1},
+                      headers={**auth_headers, "If-None-Match": full})
+    assert resp.status_code == 200
@@ -0,0 +1,33 @@
+# tests/integration/test_database_upgrade.py
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+from app.database_init import upgrade_db
+
+
+def _columns(engine, table_name):
+    return {c["name"] for c in inspect(engine).get_columns(table_name)}
+
+
+def test_upgrade_adds_and_backfills_operand_count_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_calculations_user_created_id"))
+        conn.execute(text("ALTER TABLE calculations DROP COLUMN operand_count"))
+        conn.execute(
+            text(
+                "INSERT INTO calculations (id, user_id, type, inputs, result, created_at, updated_at) "
+                "VALUES ('a' || hex(randomblob(15)), 'b' || hex(randomblob(15)), 'addition', "
+                "'[1, 2, 3]', 6, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+            )
+        )
+
+    applied = upgrade_db(engine)
+
+    assert "operand_count" in _columns(engine, "calculations")
+    assert "CREATE INDEX ix_calculations_user_created_id" in applied
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT operand_count FROM calculations")).scalar_one() == 3
+    assert upgrade_db(engine) == []
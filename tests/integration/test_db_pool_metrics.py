@@ -0,0 +1,71 @@
+# tests/integration/test_db_pool_metrics.py
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.database import InstrumentedQueuePool, get_engine, pool_status
+
+
+def test_get_engine_applies_pool_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    engine = get_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    status = pool_status(engine)
+    assert status["size"] == 2
+    assert status["max_overflow"] == 1
+    engine.dispose()
+
+
+def test_pool_status_tracks_checkouts_and_timeouts(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.01)
+    engine = get_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    conn = engine.connect()
+    assert pool_status(engine)["checked_out"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    conn.close()
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["checkout_timeouts"] == 1
+    assert status["checkout_wait_seconds"]["count"] == 2
+    engine.dispose()
+
+
+def test_memory_sqlite_keeps_default_pool():
+    engine = get_engine("sqlite:///:memory:")
+    assert "checked_out" not in pool_status(engine)
+
+
+def test_pool_status_overflow_is_never_negative(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    engine = get_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    with engine.connect():
+        assert pool_status(engine)["overflow"] == 0
+    engine.dispose()
+
+
+def test_metrics_endpoint_reports_pool(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    resp = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert "checked_out" in resp.json()["db_pool"]
+
+
+def test_metrics_endpoint_requires_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_metrics_endpoint_is_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
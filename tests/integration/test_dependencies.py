@@ -103,3 +103,69 @@ def test_get_current_active_user_inactive(mock_verify_token):
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert exc_info.value.detail == "Inactive user"
+
+
+# DB-backed resolution (AUTH_DB_LOOKUP)
+@pytest.fixture
+def db_lookup(monkeypatch):
+    from app.auth.user_cache import user_cache
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AUTH_DB_LOOKUP", True)
+    user_cache.clear()
+    yield user_cache
+    user_cache.clear()
+
+
+def test_get_current_user_db_lookup_returns_real_user(mock_verify_token, db_lookup, db_session, test_user):
+    mock_verify_token.return_value = test_user.id
+
+    current_user = get_current_user(token="validtoken", db=db_session)
+
+    assert current_user.username == test_user.username
+    assert db_lookup.get(test_user.id) == current_user
+
+
+def test_get_current_user_db_lookup_unknown_user(mock_verify_token, db_lookup, db_session):
+    mock_verify_token.return_value = uuid4()
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(token="validtoken", db=db_session)
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_deactivating_user_invalidates_cached_user(mock_verify_token, db_lookup, db_session, test_user):
+    mock_verify_token.return_value = test_user.id
+    assert get_current_active_user(get_current_user(token="validtoken", db=db_session)).is_active
+
+    test_user.is_active = False
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_active_user(get_current_user(token="validtoken", db=db_session))
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_user_cache_is_invalidated_on_commit_not_flush(mock_verify_token, db_lookup, db_session, test_user):
+    mock_verify_token.return_value = test_user.id
+    get_current_user(token="validtoken", db=db_session)
+
+    test_user.first_name = "Renamed"
+    db_session.flush()
+    assert db_lookup.get(test_user.id) is not None
+
+    db_session.commit()
+    assert db_lookup.get(test_user.id) is None
+
+
+def test_get_current_user_skips_the_session_on_cache_hit(mock_verify_token, db_lookup, db_session, test_user):
+    from unittest.mock import Mock
+
+    mock_verify_token.return_value = test_user.id
+    get_current_user(token="validtoken", db=db_session)
+
+    unused = Mock(spec=db_session)
+    assert get_current_user(token="validtoken", db=unused).id == test_user.id
+    unused.query.assert_not_called()
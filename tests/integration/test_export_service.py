@@ -0,0 +1,97 @@
+# tests/integration/test_export_service.py
+
+from app.models.calculation import Calculation
+from app.services.export_service import stream_csv
+
+
+def test_stream_csv_emits_one_chunk_per_batch(db_session, test_user):
+    db_session.add_all([
+        Calculation(user_id=test_user.id, type="addition", inputs=[i, 1], result=i + 1.0)
+        for i in range(5)
+    ])
+    db_session.commit()
+    user_id = test_user.id
+
+    chunks = list(stream_csv(db_session, user_id, batch_size=2))
+
+    # header + ceil(5 / 2) data chunks
+    assert len(chunks) == 4
+    assert chunks[0].startswith("id,type,inputs,result,created_at")
+    body = "".join(chunks)
+    assert len(body.strip().splitlines()) == 6
+    assert "4, 1" in body
+
+
+def test_export_route_streams_batches(client, db_session, test_user, monkeypatch):
+    from app.core.config import settings
+    from app.main import app
+    from app.auth.dependencies import get_current_active_user
+
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    db_session.add_all([
+        Calculation(user_id=test_user.id, type="subtraction", inputs=[9, i], result=9.0 - i)
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    app.dependency_overrides[get_current_active_user] = lambda: test_user
+    resp = client.get("/calculations/export")
+
+    assert resp.status_code == 200
+    lines = [line for line in resp.text.splitlines() if line.strip()]
+    assert len(lines) == 4
+    assert all(",subtraction," in line for line in lines[1:])
+
+
+def _export_as(client, db_session, test_user):
+    from app.main import app
+    from app.auth.dependencies import get_current_active_user
+
+    db_session.add_all([
+        Calculation(user_id=test_user.id, type="addition", inputs=[0.1, 2.5], result=2.6),
+        Calculation(user_id=test_user.id, type="division", inputs=[9, 3], result=3.0),
+    ])
+    db_session.commit()
+    app.dependency_overrides[get_current_active_user] = lambda: test_user
+
+
+def test_export_ndjson_keeps_inputs_as_arrays(client, db_session, test_user):
+    import json
+    _export_as(client, db_session, test_user)
+
+    resp = client.get("/calculations/export", params={"format": "ndjson"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["inputs"] for r in records] == [[0.1, 2.5], [9, 3]]
+
+
+def test_export_gz_file_and_type_filter(client, db_session, test_user):
+    import gzip
+    _export_as(client, db_session, test_user)
+
+    resp = client.get(
+        "/calculations/export",
+        params={"format": "csv.gz", "type": "division"},
+        headers={"Accept-Encoding": "identity"},
+    )
+
+    assert resp.headers["content-type"] == "application/gzip"
+    assert ".csv.gz" in resp.headers["content-disposition"]
+    lines = gzip.decompress(resp.content).decode().strip().splitlines()
+    assert len(lines) == 2
+    assert ",division," in lines[1]
+
+
+def test_export_transport_gzip_from_accept_encoding(client, db_session, test_user):
+    _export_as(client, db_session, test_user)
+
+    resp = client.get(
+        "/calculations/export",
+        headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"},
+    )
+
+    assert resp.headers["content-encoding"] == "gzip"
+    # httpx transparently decodes the transfer compression
+    assert len(resp.text.splitlines()) == 2
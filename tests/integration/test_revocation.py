@@ -0,0 +1,54 @@
+# tests/integration/test_revocation.py
+
+import uuid
+from datetime import datetime, timedelta
+
+from app.auth.revocation import RevocationStore
+from app.database import SessionLocal
+
+
+def _store() -> RevocationStore:
+    return RevocationStore(SessionLocal, capacity=100, error_rate=0.01, sync_interval=60, prune_interval=3600)
+
+
+def test_revoked_jti_is_reported_and_others_skip_the_database():
+    store = _store()
+    revoked = uuid.uuid4().hex
+    store.revoke(revoked, datetime.utcnow() + timedelta(minutes=5))
+
+    assert store.is_revoked(revoked)
+    assert store.known_not_revoked(uuid.uuid4().hex)
+    assert not store.known_not_revoked(revoked)
+
+
+def test_other_workers_revocations_are_picked_up_on_sync():
+    writer, reader = _store(), _store()
+    reader.sync_if_due()
+
+    jti = uuid.uuid4().hex
+    writer.revoke(jti, datetime.utcnow() + timedelta(minutes=5))
+    assert not reader.is_revoked(jti)
+
+    reader._next_sync = 0
+    assert reader.is_revoked(jti)
+
+
+def test_expired_revocations_are_pruned_on_rebuild():
+    store = _store()
+    jti = uuid.uuid4().hex
+    store.revoke(jti, datetime.utcnow() - timedelta(seconds=1))
+
+    store.reset()
+    store.sync_if_due()
+
+    assert not store.is_revoked(jti)
+
+
+def test_revoke_is_conditional():
+    store = _store()
+    jti = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+
+    assert store.revoke(jti, expires_at) is True
+    assert store.revoke(jti, expires_at) is False
+    assert store.is_revoked(jti)
@@ -62,3 +62,23 @@ def test_stats_invalid_timestamp_handling(db_session):
     assert stats["most_used_operation"] == "addition"
     assert isinstance(stats["last_calculation_date"], str)
     assert "T" in stats["last_calculation_date"]
+
+
+def test_stats_aggregates_in_database(db_session, test_user):
+    """Breakdown, operand average and last date come from the GROUP BY query."""
+    now = datetime.utcnow()
+    db_session.add_all([
+        Calculation(user_id=test_user.id, type="addition", inputs=[1, 2], result=3.0, created_at=now),
+        Calculation(user_id=test_user.id, type="addition", inputs=[1, 2, 3, 4], result=10.0, created_at=now),
+        Calculation(user_id=test_user.id, type="division", inputs=[8, 2, 2], result=2.0,
+                    created_at=now.replace(year=now.year + 1)),
+    ])
+    db_session.commit()
+
+    stats = compute_user_stats(db_session, user_id=test_user.id)
+
+    assert stats["total_calculations"] == 3
+    assert stats["operations_breakdown"] == {"addition": 2, "division": 1}
+    assert stats["most_used_operation"] == "addition"
+    assert stats["average_operands"] == 3.0
+    assert stats["last_calculation_date"].startswith(str(now.year + 1))
@@ -0,0 +1,107 @@
+# tests/integration/test_user_stats_service.py
+
+from datetime import datetime, timedelta
+
+from app.models.calculation import Calculation
+from app.models.user_stats import UserCalculationStats
+from app.services.statistics_service import compute_user_stats
+from app.services.user_stats_service import (
+    _ensure_row,
+    apply_calculation_delta,
+    get_user_stats,
+    rebuild_user_stats,
+)
+
+
+def add_calc(db_session, user, calc_type, inputs, created_at=None):
+    calc = Calculation.create(calc_type, user.id, inputs)
+    calc.result = calc.get_result()
+    if created_at is not None:
+        calc.created_at = created_at
+    db_session.add(calc)
+    db_session.flush()
+    apply_calculation_delta(
+        db_session, user.id,
+        added=[(calc.type, len(calc.inputs), calc.created_at)],
+    )
+    db_session.commit()
+    return calc
+
+
+def test_missing_row_is_backfilled(db_session, test_user):
+    db_session.add(Calculation(user_id=test_user.id, type="addition", inputs=[1, 2], result=3.0))
+    db_session.commit()
+
+    stats = get_user_stats(db_session, test_user.id)
+    db_session.commit()
+
+    assert stats["total_calculations"] == 1
+    assert db_session.get(UserCalculationStats, test_user.id).total_count == 1
+
+
+def test_delta_tracks_adds_and_deletes(db_session, test_user):
+    now = datetime.utcnow()
+    add_calc(db_session, test_user, "addition", [1, 2], now)
+    add_calc(db_session, test_user, "addition", [1, 2, 3], now + timedelta(seconds=1))
+    latest = add_calc(db_session, test_user, "power", [2, 3], now + timedelta(seconds=2))
+
+    assert get_user_stats(db_session, test_user.id) == compute_user_stats(db_session, test_user.id)
+
+    # removing the newest calculation falls back to the previous timestamp
+    facts = (latest.type, len(latest.inputs), latest.created_at)
+    db_session.delete(latest)
+    apply_calculation_delta(db_session, test_user.id, removed=[facts])
+    db_session.commit()
+
+    stats = get_user_stats(db_session, test_user.id)
+    assert stats == compute_user_stats(db_session, test_user.id)
+    assert stats["operations_breakdown"] == {"addition": 2}
+    assert stats["average_operands"] == 2.5
+
+
+def test_rebuild_repairs_drift(db_session, test_user):
+    add_calc(db_session, test_user, "subtraction", [5, 1])
+
+    # write behind the service's back
+    db_session.add(Calculation(user_id=test_user.id, type="division", inputs=[8, 2, 2], result=2.0))
+    db_session.commit()
+    assert get_user_stats(db_session, test_user.id)["total_calculations"] == 1
+
+    assert rebuild_user_stats(db_session) >= 1
+    db_session.commit()
+
+    stats = get_user_stats(db_session, test_user.id)
+    assert stats == compute_user_stats(db_session, test_user.id)
+    assert stats["total_calculations"] == 2
+
+
+def test_first_write_tolerates_row_created_concurrently(db_session, test_user):
+    # Another transaction won the race and created the (empty) row first
+    _ensure_row(db_session, test_user.id)
+    _ensure_row(db_session, test_user.id)
+    db_session.commit()
+
+    add_calc(db_session, test_user, "addition", [1, 2])
+
+    assert db_session.query(UserCalculationStats).filter_by(user_id=test_user.id).count() == 1
+    assert get_user_stats(db_session, test_user.id) == compute_user_stats(db_session, test_user.id)
+
+
+def test_deleting_a_legacy_row_keeps_operand_sum(db_session, test_user):
+    from app.services.calculation_service import delete_calculation
+
+    add_calc(db_session, test_user, "addition", [1, 2, 3])
+    legacy = add_calc(db_session, test_user, "addition", [4, 5, 6, 7])
+    # Written before operand_count existed
+    db_session.execute(
+        Calculation.__table__.update()
+        .where(Calculation.__table__.c.id == legacy.id)
+        .values(operand_count=None)
+    )
+    db_session.commit()
+
+    delete_calculation(db_session, test_user.id, str(legacy.id))
+
+    stats = get_user_stats(db_session, test_user.id)
+    assert stats == compute_user_stats(db_session, test_user.id)
+    assert stats["average_operands"] == 3
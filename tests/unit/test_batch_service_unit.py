@@ -0,0 +1,119 @@
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.calculation import Calculation
+from app.services import batch_service
+from app.services.batch_service import evaluate_batch, normalize_type
+from app.services.calc_executor import WORKERS_UNAVAILABLE
+
+
+def scalar(calc_type, inputs):
+    return Calculation.create(calc_type, uuid.uuid4(), inputs).get_result()
+
+
+# ------------------ MATCHES SCALAR PATH ------------------
+
+@pytest.mark.parametrize("calc_type, inputs", [
+    ("addition", [0.1, 0.2, 0.3]),
+    ("subtraction", [10.5, 3.25, 2.0]),
+    ("multiplication", [1.1, 2.2, 3.3]),
+    ("division", [100.0, 3.0, 7.0]),
+    ("exponentiation", [2.0, 3.0, 2.0]),
+    ("power", [2.0, 0.5]),
+    ("modulus", [-7.0, 3.0]),
+])
+def test_batch_matches_get_result(calc_type, inputs):
+    [(value, error)] = evaluate_batch([(calc_type, inputs)])
+    assert error is None
+    assert value == scalar(calc_type, inputs)
+
+
+def test_batch_preserves_order_across_groups():
+    items = [
+        ("addition", [1, 2]),
+        ("multiplication", [2, 3, 4]),
+        ("addition", [5, 5]),
+        ("subtraction", [9, 1]),
+    ]
+    outcomes = evaluate_batch(items)
+    assert [value for value, _ in outcomes] == [3.0, 24.0, 10.0, 8.0]
+
+
+# ------------------ PER-ITEM ERRORS ------------------
+
+def test_batch_reports_division_by_zero_per_item():
+    outcomes = evaluate_batch([
+        ("division", [10, 2]),
+        ("division", [10, 0]),
+    ])
+    assert outcomes[0] == (5.0, None)
+    assert outcomes[1] == (None, "Cannot divide by zero.")
+
+
+def test_batch_reports_modulus_by_zero():
+    [(value, error)] = evaluate_batch([("modulus", [5, 0])])
+    assert value is None
+    assert error == "Modulus by zero undefined."
+
+
+def test_batch_reports_too_few_operands():
+    [(value, error)] = evaluate_batch([("addition", [1])])
+    assert value is None
+    assert error == "Inputs must be a list with at least two numbers."
+
+
+def test_batch_reports_power_operand_count():
+    [(_, error)] = evaluate_batch([("power", [1, 2, 3])])
+    assert error == "Power requires exactly 2 values."
+
+
+def test_batch_reports_unsupported_type():
+    [(_, error)] = evaluate_batch([("sqrt", [4, 2])])
+    assert error == "Unsupported calculation type"
+
+
+def test_batch_reports_overflow():
+    [(value, error)] = evaluate_batch([("power", [10.0, 400.0])])
+    assert value is None
+    assert error
+
+
+def test_normalize_type():
+    assert normalize_type("  Addition ") == "addition"
+    assert normalize_type("unknown") is None
+    assert normalize_type(123) is None
+
+
+def test_evaluate_vector_matches_scalar_fold():
+    import numpy as np
+    from app.services.batch_service import evaluate_scalar, evaluate_vector
+
+    values = [100.0, 3.0, 7.0, 0.5]
+    for calc_key in ("addition", "subtraction", "multiplication", "division", "exponentiation"):
+        assert evaluate_vector(calc_key, np.array(values)) == evaluate_scalar(calc_key, values)[0]
+
+
+def test_decode_packed_inputs_rejects_non_finite():
+    import numpy as np
+    from app.services.batch_service import decode_packed_inputs
+
+    assert decode_packed_inputs(np.array([1.5, 2.5]).astype("<f8").tobytes()).tolist() == [1.5, 2.5]
+    with pytest.raises(ValueError, match="finite"):
+        decode_packed_inputs(np.array([1.0, np.nan], dtype="<f8").tobytes())
+
+
+@pytest.mark.parametrize("failure, message", [
+    (HTTPException(status_code=504, detail="Calculation timed out."), "Calculation timed out."),
+    (BrokenProcessPool("worker died"), WORKERS_UNAVAILABLE),
+])
+def test_executor_failure_is_an_item_error(monkeypatch, failure, message):
+    def fail(calculation):
+        raise failure
+
+    monkeypatch.setattr(batch_service, "compute_result", fail)
+    outcomes = evaluate_batch([("addition", [1, 2]), ("division", [1, 0])])
+
+    assert outcomes == [(3.0, None), (None, message)]
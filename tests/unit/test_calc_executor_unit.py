@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.calculation import Addition, Division, Exponentiation
+from app.services import calc_executor
+from app.services.calc_executor import CalculationExecutor, estimate_cost
+
+
+def test_estimate_cost_counts_operands_and_power_digits():
+    assert estimate_cost("addition", [1, 2, 3]) == 3
+    assert estimate_cost("exponentiation", [10, 100]) == 2 + 100
+    assert estimate_cost("power", "bad") == 0
+
+
+def test_cheap_calculations_run_inline():
+    executor = CalculationExecutor(max_workers=1, min_cost=1000, timeout=5)
+
+    assert executor.run(Addition(inputs=[1, 2])) == 3
+    assert executor.stats()["offloaded"] == 0
+    assert executor.stats()["execution_seconds"]["addition"]["count"] == 1
+    assert executor._pool is None
+
+
+def test_expensive_calculations_run_in_pool_and_keep_value_errors():
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=60)
+    try:
+        assert executor.run(Exponentiation(inputs=[2, 10])) == 1024.0
+        with pytest.raises(ValueError, match="Cannot divide by zero."):
+            executor.run(Division(inputs=[1, 0]))
+        assert executor.stats()["offloaded"] == 2
+        assert executor.stats()["queue_depth"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_task_past_deadline_returns_504():
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=0.0001)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            executor.run(Addition(inputs=[1, 2]))
+        assert exc.value.status_code == 504
+        assert executor.stats()["timeouts"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_cheap_calculations_run_inline_on_the_event_loop():
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=5)
+
+    assert asyncio.run(executor.run_async(Addition(inputs=[1, 2]))) == 3
+    assert executor._pool is None
+
+
+def test_async_task_past_deadline_returns_504(monkeypatch):
+    monkeypatch.setattr(calc_executor, "ASYNC_INLINE_MAX_COST", -1)
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=0.0001)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(executor.run_async(Addition(inputs=[1, 2])))
+        assert exc.value.status_code == 504
+    finally:
+        executor.shutdown()
+
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated_at = None
+
+    def is_alive(self):
+        return self.terminated_at is None
+
+    def terminate(self):
+        self.terminated_at = time.monotonic()
+
+
+class FakePool:
+    def __init__(self, outcome=None):
+        self.outcome = outcome
+        self._processes = {1: FakeProcess()}
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(self.outcome)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_returns_503_and_is_replaced():
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=5)
+    pool = FakePool(BrokenProcessPool("worker died"))
+    executor._pool = pool
+
+    with pytest.raises(HTTPException) as exc:
+        executor._run_in_pool("addition", [1, 2])
+
+    assert exc.value.status_code == 503
+    assert executor.stats()["broken_pools"] == 1
+    assert executor._pool is not pool
+    executor.shutdown()
+
+
+def test_retired_pool_lets_other_tasks_finish_before_terminating():
+    executor = CalculationExecutor(max_workers=1, min_cost=0, timeout=5)
+    pool = FakePool()
+    executor._pool = pool
+    other = Future()
+    executor._inflight[pool] = {other}
+    finished = []
+    threading.Timer(0.2, lambda: (finished.append(time.monotonic()), other.set_result(3))).start()
+
+    executor._retire(pool)
+    assert executor._pool is None
+    assert pool._processes[1].terminated_at is None
+
+    executor._reap(pool)
+
+    assert other.result() == 3
+    assert pool._processes[1].terminated_at >= finished[0]
+    assert pool.shut_down
@@ -71,6 +71,12 @@ def test_exponentiation_happy_path():
     assert calc.get_result() == 8.0
 
 
+def test_exponentiation_chain_over_budget_is_rejected():
+    calc = Exponentiation(user_id=uuid.uuid4(), inputs=[10, 10, 10, 10])
+    with pytest.raises(ValueError, match="Result is too large."):
+        calc.get_result()
+
+
 def test_exponentiation_invalid_inputs():
     calc = Exponentiation(user_id=uuid.uuid4(), inputs="bad")
     with pytest.raises(ValueError):
@@ -84,6 +90,15 @@ def test_power_happy_path():
     assert calc.get_result() == 16.0
 
 
+def test_power_over_budget_is_rejected(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CALC_MAX_RESULT_DIGITS", 10)
+
+    assert Power(user_id=uuid.uuid4(), inputs=[10, 10]).get_result() == 1e10
+    with pytest.raises(ValueError, match="Result is too large."):
+        Power(user_id=uuid.uuid4(), inputs=[10, 11]).get_result()
+
+
 def test_power_requires_exact_two_inputs():
     calc = Power(user_id=uuid.uuid4(), inputs=[2, 3, 4])
     with pytest.raises(ValueError):
@@ -0,0 +1,22 @@
+import uuid
+import pytest
+from datetime import datetime
+
+from app.services.calculation_query import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    calc_id = uuid.uuid4()
+
+    token = encode_cursor(created_at, calc_id)
+
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, calc_id)
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "WyJ4Il0"])
+def test_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        decode_cursor(token)
+
@@ -1,8 +1,13 @@
 # tests/unit/test_calculation_schema_unit.py
 
+import json
 import uuid
 import pytest
+from array import array
 from datetime import datetime
+from types import SimpleNamespace
+
+from pydantic import ValidationError
 
 from app.schemas.calculation import (
     CalculationBase,
@@ -10,6 +15,8 @@ from app.schemas.calculation import (
     CalculationUpdate,
     CalculationResponse,
     CalculationType,
+    calculation_list_adapter,
+    dump_calculations,
 )
 
 
@@ -98,3 +105,42 @@ def test_calculation_response_valid():
     )
 
     assert schema.result == 3.0
+
+
+def test_calculation_response_skips_input_validators():
+    # Stored rows are trusted: no division-by-zero re-check on the way out
+    now = datetime.utcnow()
+    schema = CalculationResponse(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        type="division",
+        inputs=[1, 0],
+        result=0.0,
+        created_at=now,
+        updated_at=now,
+    )
+    assert schema.inputs == [1.0, 0.0]
+
+
+def test_dump_calculations_matches_response_model():
+    now = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    rows = [
+        SimpleNamespace(id=uuid.uuid4(), user_id=uuid.uuid4(), type="addition",
+                        inputs=inputs, result=3.5, created_at=now, updated_at=now)
+        for inputs in ([1.0, 2.5], array("d", [1.0, 2.5]))
+    ]
+
+    expected = [CalculationResponse.model_validate(r).model_dump(mode="json") for r in rows]
+
+    assert json.loads(dump_calculations(rows)) == expected
+    assert isinstance(calculation_list_adapter.validate_python(rows, from_attributes=True)[0],
+                      CalculationResponse)
+
+
+def test_dump_calculations_rejects_rows_breaking_the_contract():
+    now = datetime(2025, 1, 2, 3, 4, 5)
+    row = SimpleNamespace(id=uuid.uuid4(), user_id=uuid.uuid4(), type="addition",
+                          inputs=[1.0, 2.0], result=None, created_at=now, updated_at=now)
+    with pytest.raises(ValidationError):
+        dump_calculations([row])
+
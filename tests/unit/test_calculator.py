@@ -2,7 +2,7 @@
 
 import pytest  # Import the pytest framework for writing and running tests
 from typing import Union  # Import Union for type hinting multiple possible types
-from app.operations import add, subtract, multiply, divide  # Import the calculator functions from the operations module
+from app.operations import add, subtract, multiply, divide, power  # Import the calculator functions from the operations module
 
 # Define a type alias for numbers that can be either int or float
 Number = Union[int, float]
@@ -232,3 +232,21 @@ def test_divide_by_zero() -> None:
     # Assert that the exception message contains the expected error message
     assert "Cannot divide by zero!" in str(excinfo.value), \
         f"Expected error message 'Cannot divide by zero!', but got '{excinfo.value}'"
+
+
+# ---------------------------------------------
+# Cost-bounded power
+# ---------------------------------------------
+
+def test_power_within_budget() -> None:
+    """Powers under the digit budget are computed exactly."""
+    assert power(2, 10) == 1024
+    assert power(10, 300) == 10 ** 300
+    assert power(0.5, 10000) == 0.0
+
+
+@pytest.mark.parametrize("a, b", [(10, 400), (10.0, 309), (7, 10 ** 12)])
+def test_power_over_budget(a: Number, b: Number) -> None:
+    """Oversized powers raise ValueError before (or instead of) overflowing."""
+    with pytest.raises(ValueError, match="Result is too large."):
+        power(a, b)
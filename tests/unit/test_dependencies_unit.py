@@ -1,10 +1,16 @@
 # tests/unit/test_dependencies_unit.py
 
+import asyncio
 import uuid
 import pytest
 from datetime import datetime
 
-from app.auth.dependencies import get_current_user, get_current_active_user
+from app.auth.dependencies import (
+    get_current_active_user,
+    get_current_active_user_async,
+    get_current_user,
+    get_current_user_async,
+)
 from app.schemas.user import UserResponse
 from app.models.user import User
 from fastapi import HTTPException
@@ -84,3 +90,77 @@ def test_get_current_active_user_valid():
 
     result = get_current_active_user(active)
     assert result.username == "active"
+
+
+def test_get_current_user_caches_verified_token(monkeypatch):
+    from jose import jwt as jose_jwt
+    from app.auth.token_cache import token_cache
+
+    uid = uuid.uuid4()
+    token = jose_jwt.encode(
+        {"sub": str(uid), "exp": int(datetime.utcnow().timestamp()) + 3600, "jti": uuid.uuid4().hex},
+        "secret",
+        algorithm="HS256",
+    )
+    calls = []
+
+    def verify(tok):
+        calls.append(tok)
+        return uid
+
+    monkeypatch.setattr(User, "verify_token", verify)
+
+    first = get_current_user(token=token)
+    second = get_current_user(token=token)
+
+    assert first is second
+    assert len(calls) == 1
+    token_cache.clear()
+
+
+def test_get_current_user_async_serves_cached_user_without_io(monkeypatch):
+    from jose import jwt as jose_jwt
+    from app.auth import dependencies
+    from app.auth.token_cache import token_cache
+
+    uid = uuid.uuid4()
+    token = jose_jwt.encode(
+        {"sub": str(uid), "exp": int(datetime.utcnow().timestamp()) + 3600},
+        "secret",
+        algorithm="HS256",
+    )
+    monkeypatch.setattr(User, "verify_token", lambda token: uid)
+    monkeypatch.setattr(dependencies.revocation_store, "sync_due", lambda: False)
+
+    async def never(*args, **kwargs):
+        raise AssertionError("unexpected I/O")
+
+    monkeypatch.setattr(dependencies, "run_in_threadpool", never)
+    monkeypatch.setattr(dependencies, "is_blacklisted", never)
+
+    user = asyncio.run(get_current_user_async(token=token))
+    active = asyncio.run(get_current_active_user_async(user))
+
+    assert active.id == uid
+    assert token_cache.get(token) is user
+    token_cache.clear()
+
+
+def test_get_current_user_async_rejects_revoked_token(monkeypatch):
+    from jose import jwt as jose_jwt
+    from app.auth import dependencies
+
+    uid = uuid.uuid4()
+    token = jose_jwt.encode({"sub": str(uid), "jti": "revoked"}, "secret", algorithm="HS256")
+    monkeypatch.setattr(User, "verify_token", lambda tok: uid)
+    monkeypatch.setattr(dependencies.revocation_store, "sync_due", lambda: False)
+
+    async def revoked(jti):
+        return jti == "revoked"
+
+    monkeypatch.setattr(dependencies, "is_blacklisted", revoked)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_current_user_async(token=token))
+
+    assert exc.value.status_code == 401
@@ -0,0 +1,66 @@
+import gzip
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.export_service import negotiate_export, gzip_stream
+
+
+def test_default_is_plain_csv():
+    fmt = negotiate_export()
+    assert fmt.encoding == "csv"
+    assert fmt.media_type == "text/csv"
+    assert fmt.content_encoding is None
+
+
+def test_accept_header_selects_ndjson():
+    fmt = negotiate_export(accept="application/x-ndjson")
+    assert fmt.encoding == "ndjson"
+    assert fmt.extension == "ndjson"
+
+
+def test_format_parameter_wins_over_accept():
+    fmt = negotiate_export(format="csv", accept="application/x-ndjson")
+    assert fmt.encoding == "csv"
+
+
+def test_gz_format_is_a_file_not_transport_encoding():
+    fmt = negotiate_export(format="ndjson.gz", accept_encoding="gzip")
+    assert fmt.gzip_file is True
+    assert fmt.content_encoding is None
+    assert fmt.media_type == "application/gzip"
+    assert fmt.extension == "ndjson.gz"
+
+
+def test_accept_encoding_gzip_compresses_in_flight():
+    fmt = negotiate_export(accept_encoding="br, gzip;q=0.8")
+    assert fmt.content_encoding == "gzip"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("text/csv;q=0, application/x-ndjson", "ndjson"),
+    ("text/csv;q=0, */*", "ndjson"),
+    ("text/csv;q=0.5, application/x-ndjson;q=0.9", "ndjson"),
+    ("text/csv, application/x-ndjson;q=0.5", "csv"),
+    ("application/x-ndjson;q=0, */*", "csv"),
+    ("application/json", "csv"),
+])
+def test_accept_q_values(accept, expected):
+    assert negotiate_export(accept=accept).encoding == expected
+
+
+def test_all_formats_refused_is_406():
+    with pytest.raises(HTTPException) as exc:
+        negotiate_export(accept="text/csv;q=0, application/x-ndjson;q=0")
+    assert exc.value.status_code == 406
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "br", "*;q=0"])
+def test_accept_encoding_respects_q_zero(accept_encoding):
+    assert negotiate_export(accept_encoding=accept_encoding).content_encoding is None
+
+
+def test_gzip_stream_round_trips():
+    chunks = ["a,b\n", "1,2\n" * 1000, "3,4\n"]
+    compressed = b"".join(gzip_stream(chunks))
+    assert gzip.decompress(compressed).decode() == "".join(chunks)
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth.hashing import BoundedExecutor
+
+
+def test_run_returns_result_and_records_timings():
+    executor = BoundedExecutor(max_workers=1, queue_limit=0)
+    assert executor.run(lambda a, b: a + b, 2, 3) == 5
+
+    stats = executor.stats()
+    assert stats["in_flight"] == 0
+    assert stats["queue_wait_seconds"]["count"] == 1
+    assert stats["hash_seconds"]["count"] == 1
+
+
+def test_saturated_executor_rejects_with_503():
+    executor = BoundedExecutor(max_workers=1, queue_limit=0)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=executor.run, args=(block,))
+    worker.start()
+    started.wait(5)
+
+    with pytest.raises(HTTPException) as exc:
+        executor.run(lambda: None)
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    worker.join(5)
+    assert executor.run(lambda: "ok") == "ok"
+
+
+def test_errors_propagate_and_free_the_slot():
+    executor = BoundedExecutor(max_workers=1, queue_limit=0)
+    with pytest.raises(ZeroDivisionError):
+        executor.run(lambda: 1 / 0)
+    assert executor.run(lambda: 1) == 1
+
+
+def test_run_async_awaits_result_and_frees_the_slot():
+    executor = BoundedExecutor(max_workers=1, queue_limit=0)
+
+    async def main():
+        return await executor.run_async(lambda a, b: a * b, 6, 7)
+
+    assert asyncio.run(main()) == 42
+    assert executor.stats()["in_flight"] == 0
+    assert executor.run(lambda: "ok") == "ok"
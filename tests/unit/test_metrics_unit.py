@@ -0,0 +1,25 @@
+from app.core.metrics import Counter, Histogram, collect, register_source
+
+
+def test_counter_increments():
+    counter = Counter()
+    counter.inc()
+    counter.inc(4)
+    assert counter.value == 5
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        hist.observe(value)
+
+    snap = hist.snapshot()
+    assert snap["count"] == 4
+    assert snap["buckets"] == {"0.1": 1, "1.0": 3, "+Inf": 4}
+    assert abs(snap["sum"] - 4.25) < 1e-9
+
+
+def test_collect_uses_latest_registration():
+    register_source("unit_test_source", lambda: {"v": 1})
+    register_source("unit_test_source", lambda: {"v": 2})
+    assert collect()["unit_test_source"] == {"v": 2}
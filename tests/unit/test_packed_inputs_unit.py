@@ -0,0 +1,60 @@
+import uuid
+from array import array
+from datetime import datetime
+
+import pytest
+
+from app.models.calculation import Addition, Division, PackedFloats, Power
+from app.schemas.calculation import CalculationResponse
+
+
+def test_binary_storage_round_trips_through_array(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CALC_INPUTS_STORAGE", "binary")
+    column_type = PackedFloats()
+
+    packed = column_type.process_bind_param([1, 2.5, -3], dialect=None)
+    assert packed == array("d", [1.0, 2.5, -3.0]).tobytes()
+
+    loaded = column_type.process_result_value(packed, dialect=None)
+    assert isinstance(loaded, array)
+    assert loaded.tolist() == [1.0, 2.5, -3.0]
+
+
+def test_json_storage_passes_lists_through(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CALC_INPUTS_STORAGE", "json")
+    column_type = PackedFloats()
+
+    assert column_type.process_bind_param(array("d", [1, 2]), dialect=None) == [1.0, 2.0]
+    assert column_type.process_result_value([1, 2], dialect=None) == [1, 2]
+
+
+def test_operand_count_follows_inputs():
+    calc = Addition(user_id=uuid.uuid4(), inputs=[1, 2, 3])
+    assert calc.operand_count == 3
+
+    calc.inputs = [4, 5]
+    assert calc.operand_count == 2
+
+
+def test_subclasses_evaluate_packed_inputs():
+    assert Addition(inputs=array("d", [1, 2, 3])).get_result() == 6.0
+    assert Power(inputs=array("d", [2, 10])).get_result() == 1024.0
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        Division(inputs=array("d", [1, 0])).get_result()
+
+
+def test_response_schema_unpacks_array():
+    now = datetime.utcnow()
+    calc = Addition(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        type="addition",
+        inputs=array("d", [1, 2]),
+        result=3.0,
+        created_at=now,
+        updated_at=now,
+    )
+
+    assert CalculationResponse.model_validate(calc).inputs == [1.0, 2.0]
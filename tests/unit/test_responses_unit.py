@@ -0,0 +1,39 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from app.core import responses
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, json_response_class
+
+
+def test_response_class_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    assert json_response_class() is JSONResponse
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json_response_class() is JSONResponse
+
+
+def test_fast_response_encodes_like_json_response():
+    pytest.importorskip("orjson")
+    payload = {"total_calculations": 2, "average_operands": 2.5,
+               "operations_breakdown": {"addition": 2}, "most_used_operation": "addition"}
+
+    fast = FastJSONResponse(payload)
+
+    assert fast.media_type == "application/json"
+    assert json.loads(fast.body) == json.loads(JSONResponse(payload).body)
+
+
+def test_fast_response_handles_uuid_and_datetime():
+    pytest.importorskip("orjson")
+    calc_id, now = uuid.uuid4(), datetime(2025, 1, 2, 3, 4, 5)
+
+    body = json.loads(FastJSONResponse({"id": calc_id, "created_at": now}).body)
+
+    assert body == {"id": str(calc_id), "created_at": now.isoformat()}
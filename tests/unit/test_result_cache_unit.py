@@ -0,0 +1,81 @@
+import pytest
+
+from app.models.calculation import Division, Exponentiation
+from app.services.result_cache import ResultCache, compute_result, result_cache, result_key
+
+
+def test_repeat_inputs_hit_the_cache():
+    cache = ResultCache(maxsize=10, max_operands=100)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 5
+
+    assert cache.get_or_compute("addition", [2, 3], compute) == 5
+    assert cache.get_or_compute("addition", [2, 3], compute) == 5
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_value_error_is_cached_and_reraised_verbatim():
+    cache = ResultCache(maxsize=10, max_operands=100)
+    calc = Division(inputs=[1, 0])
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Cannot divide by zero."):
+            cache.get_or_compute("division", calc.inputs, calc.get_result)
+
+    assert cache.stats()["hits"] == 1
+
+
+def test_operand_types_are_part_of_the_key():
+    assert result_key("power", [10, 2]) != result_key("power", [10.0, 2])
+    assert result_key("power", [[1], 2]) is None
+    assert result_key("power", "10,2") is None
+
+
+def test_oversized_inputs_skip_the_cache(monkeypatch):
+    from app.services import result_cache as module
+
+    def no_key(calc_key, inputs):
+        raise AssertionError("key built for uncacheable inputs")
+
+    monkeypatch.setattr(module, "result_key", no_key)
+    cache = ResultCache(maxsize=10, max_operands=3)
+
+    assert cache.get_or_compute("addition", [1, 1, 1, 1], lambda: 4) == 4
+    assert cache.stats()["misses"] == 0
+    assert cache.stats()["size"] == 0
+
+
+def test_eviction_respects_entry_and_operand_bounds():
+    cache = ResultCache(maxsize=2, max_operands=5)
+    cache.get_or_compute("addition", [1, 2], lambda: 3)
+    cache.get_or_compute("addition", [1, 3], lambda: 4)
+    cache.get_or_compute("addition", [1, 4], lambda: 5)
+    assert cache.stats()["size"] == 2
+
+    cache.get_or_compute("addition", [1, 1, 1, 1], lambda: 4)
+    stats = cache.stats()
+    assert stats["operands"] <= 5
+    assert stats["evictions"] >= 2
+
+
+def test_eviction_prefers_cheapest_entry():
+    cache = ResultCache(maxsize=2, max_operands=100)
+    cache._store("expensive", 1, None, cost=1.0, operands=2)
+    cache._store("cheap", 2, None, cost=0.0001, operands=2)
+    cache._store("new", 3, None, cost=0.5, operands=2)
+
+    assert "expensive" in cache._entries
+    assert "cheap" not in cache._entries
+
+
+def test_compute_result_uses_polymorphic_type():
+    result_cache.clear()
+    assert compute_result(Exponentiation(inputs=[2, 3])) == 8.0
+    assert compute_result(Exponentiation(inputs=[2, 3])) == 8.0
+    assert result_key("exponentiation", [2, 3]) in result_cache._entries
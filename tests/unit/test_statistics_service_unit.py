@@ -16,10 +16,15 @@ class FakeCalculation:
 
 # ---- FAKE DB SESSION ----
 class FakeDB:
+    """
+    Mimics the GROUP BY query: returns one
+    (user_id, type, count, operand_sum, max_created_at) row per stored
+    (user, type).
+    """
     def __init__(self, records):
         self._records = records
 
-    def query(self, model):
+    def query(self, *columns):
         class _Q:
             def __init__(self, outer):
                 self.outer = outer
@@ -28,8 +33,20 @@ class FakeDB:
                 # ignore condition (simple mock)
                 return self
 
+            def group_by(self, *columns):
+                return self
+
             def all(self):
-                return self.outer._records
+                groups = {}
+                for r in self.outer._records:
+                    key = (r.user_id, r.type)
+                    count, operands, last = groups.get(key, (0, 0, None))
+                    groups[key] = (
+                        count + 1,
+                        operands + (len(r.inputs) if r.inputs else 0),
+                        r.created_at if last is None else max(last, r.created_at),
+                    )
+                return [(u, t, c, o, l) for (u, t), (c, o, l) in groups.items()]
 
         return _Q(self)
 
@@ -83,3 +100,18 @@ def test_stats_with_missing_inputs_field():
 
     assert stats["average_operands"] == 0.0
     assert stats["total_calculations"] == 2
+
+
+def test_stats_merges_case_variants_of_type():
+    uid = uuid4()
+    now = datetime.utcnow()
+
+    records = [
+        FakeCalculation(uid, "addition", [1, 2], now),
+        FakeCalculation(uid, " Addition", [1, 2, 3], now + timedelta(seconds=1)),
+    ]
+
+    stats = compute_user_stats(FakeDB(records), uid)
+
+    assert stats["operations_breakdown"] == {"addition": 2}
+    assert stats["average_operands"] == pytest.approx(2.5)
@@ -0,0 +1,75 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+
+from app.auth.token_cache import TokenCache
+
+
+def _token(exp_delta: timedelta = timedelta(minutes=5), jti: str = None) -> str:
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "exp": datetime.now(timezone.utc) + exp_delta,
+        "jti": jti or uuid.uuid4().hex,
+    }
+    return jwt.encode(claims, "secret", algorithm="HS256")
+
+
+def test_put_then_get_counts_hits_and_misses():
+    cache = TokenCache(maxsize=4)
+    token = _token()
+
+    assert cache.get(token) is None
+    cache.put(token, "user")
+    assert cache.get(token) == "user"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_tokens_without_exp_are_not_cached():
+    cache = TokenCache(maxsize=4)
+    cache.put("not-a-jwt", "user")
+    cache.put(jwt.encode({"sub": "x"}, "secret", algorithm="HS256"), "user")
+    assert cache.stats()["size"] == 0
+
+
+def test_entry_expires_at_token_exp(monkeypatch):
+    cache = TokenCache(maxsize=4)
+    token = _token(timedelta(seconds=60))
+    cache.put(token, "user")
+
+    later = time.time() + 120
+    monkeypatch.setattr("app.auth.token_cache.time.time", lambda: later)
+
+    assert cache.get(token) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(maxsize=2)
+    first, second, third = _token(), _token(), _token()
+    cache.put(first, 1)
+    cache.put(second, 2)
+    cache.get(first)
+    cache.put(third, 3)
+
+    assert cache.get(second) is None
+    assert cache.get(first) == 1
+    assert cache.get(third) == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_jti_drops_revoked_token():
+    cache = TokenCache(maxsize=4)
+    revoked, kept = _token(jti="revoked"), _token(jti="kept")
+    cache.put(revoked, "a")
+    cache.put(kept, "b")
+
+    cache.invalidate_jti("revoked")
+
+    assert cache.get(revoked) is None
+    assert cache.get(kept) == "b"
@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+
+from app.auth.user_cache import UserCache
+from app.schemas.user import UserResponse
+
+
+def _user() -> UserResponse:
+    return UserResponse(
+        id=uuid.uuid4(),
+        username="cached",
+        email="cached@example.com",
+        first_name="Cached",
+        last_name="User",
+        is_active=True,
+        is_verified=True,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+
+def test_put_then_get_until_ttl(monkeypatch):
+    cache = UserCache(maxsize=4, ttl=30)
+    user = _user()
+    cache.put(user)
+    assert cache.get(user.id) is user
+
+    later = cache._entries[user.id][1] + 1
+    monkeypatch.setattr("app.auth.user_cache.time.monotonic", lambda: later)
+
+    assert cache.get(user.id) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_invalidate_drops_entry():
+    cache = UserCache(maxsize=4, ttl=30)
+    user = _user()
+    cache.put(user)
+
+    cache.invalidate(user.id)
+
+    assert cache.get(user.id) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_maxsize_evicts_oldest():
+    cache = UserCache(maxsize=1, ttl=30)
+    first, second = _user(), _user()
+    cache.put(first)
+    cache.put(second)
+
+    assert cache.get(first.id) is None
+    assert cache.get(second.id) is second
+
+
+def test_put_is_dropped_if_invalidated_while_loading():
+    cache = UserCache(maxsize=4, ttl=30)
+    user = _user()
+
+    generation = cache.generation(user.id)
+    cache.invalidate(user.id)  # a concurrent update commits mid-read
+    cache.put(user, generation)
+    assert cache.get(user.id) is None
+
+    cache.put(user, cache.generation(user.id))
+    assert cache.get(user.id) is user
+
+
+def test_pruned_generations_still_reject_stale_puts():
+    cache = UserCache(maxsize=1, ttl=30)
+    user = _user()
+
+    generation = cache.generation(user.id)
+    cache.invalidate(user.id)
+    cache.invalidate(uuid.uuid4())  # prunes user.id's generation
+
+    cache.put(user, generation)
+    assert cache.get(user.id) is None